@@ -0,0 +1,17 @@
+"""simpleai: small, uniform wrappers around LLM provider SDKs."""
+
+from .adapters.base import AdapterResponse, Citation, ProviderError
+from .api import arun_prompt, run_prompt, run_prompt_batch
+from .logger import PromptLogger
+from .settings import SettingsError
+
+__all__ = [
+    "AdapterResponse",
+    "Citation",
+    "PromptLogger",
+    "ProviderError",
+    "SettingsError",
+    "arun_prompt",
+    "run_prompt",
+    "run_prompt_batch",
+]
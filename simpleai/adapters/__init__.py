@@ -0,0 +1,63 @@
+"""Provider adapter registry; adapter modules (and their SDKs) load lazily."""
+
+from __future__ import annotations
+
+import importlib
+from functools import lru_cache
+
+from .base import AdapterResponse, BaseAdapter, Citation, ProviderError
+
+# Provider name -> "module:Class" spec. Specs keep this module import
+# from pulling in every provider SDK; only the adapter actually used is
+# imported, via get_adapter_class.
+ADAPTER_CLASSES: dict[str, str] = {
+    "anthropic": "simpleai.adapters.anthropic_adapter:AnthropicAdapter",
+    "gemini": "simpleai.adapters.gemini_adapter:GeminiAdapter",
+    "grok": "simpleai.adapters.grok_adapter:GrokAdapter",
+    "openai": "simpleai.adapters.openai_adapter:OpenAIAdapter",
+    "perplexity": "simpleai.adapters.perplexity_adapter:PerplexityAdapter",
+}
+
+
+@lru_cache(maxsize=None)
+def get_adapter_class(name: str) -> type[BaseAdapter]:
+    """Resolve (and cache) the adapter class for provider ``name``.
+
+    Raises ``KeyError`` for unknown providers and ``ImportError`` when the
+    provider's SDK is not installed.
+    """
+    module_name, _, class_name = ADAPTER_CLASSES[name].partition(":")
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+_LAZY_EXPORTS = {
+    "AnthropicAdapter": "simpleai.adapters.anthropic_adapter",
+    "AsyncAnthropicAdapter": "simpleai.adapters.anthropic_adapter",
+    "GeminiAdapter": "simpleai.adapters.gemini_adapter",
+    "GrokAdapter": "simpleai.adapters.grok_adapter",
+    "OpenAIAdapter": "simpleai.adapters.openai_adapter",
+    "PerplexityAdapter": "simpleai.adapters.perplexity_adapter",
+}
+
+
+def __getattr__(name: str):  # PEP 562: keep the class re-exports lazy too.
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module_name), name)
+
+
+__all__ = [
+    "ADAPTER_CLASSES",
+    "AdapterResponse",
+    "AnthropicAdapter",
+    "AsyncAnthropicAdapter",
+    "BaseAdapter",
+    "Citation",
+    "GeminiAdapter",
+    "GrokAdapter",
+    "OpenAIAdapter",
+    "PerplexityAdapter",
+    "ProviderError",
+    "get_adapter_class",
+]
@@ -0,0 +1,106 @@
+"""Response cache for deterministic adapter calls.
+
+Keys are a SHA-256 of the canonicalized request payload, so identical
+``(provider, model, prompt, options)`` tuples hit memory (or the optional
+SQLite file) instead of the network.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from time import time
+from typing import Any
+
+
+def response_cache_key(
+    provider: str,
+    model: str,
+    prompt: Any,
+    adapter_options: dict[str, Any],
+    output_format: type | None,
+    files_fingerprint: tuple = (),
+    require_search: bool = False,
+    return_citations: bool = False,
+) -> str:
+    """SHA-256 hex digest of the canonicalized request payload."""
+    payload = {
+        "provider": provider,
+        "model": model,
+        "prompt": prompt,
+        "opts": adapter_options,
+        "fmt": output_format and output_format.__name__,
+        "files": list(files_fingerprint),
+        "search": require_search,
+        "citations": return_citations,
+    }
+    return hashlib.sha256(
+        json.dumps(payload, sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class ResponseCache:
+    """In-memory LRU with an optional SQLite file behind it.
+
+    Values are ``AdapterResponse.model_dump()`` dicts. Entries expire
+    after ``ttl_seconds``; the in-memory tier holds at most ``max_entries``
+    and evicts least-recently-used.
+    """
+
+    __slots__ = ("ttl_seconds", "max_entries", "_entries", "_lock", "_db")
+
+    def __init__(
+        self,
+        ttl_seconds: float = 86_400,
+        max_entries: int = 256,
+        sqlite_path: str | None = None,
+    ) -> None:
+        self.ttl_seconds = float(ttl_seconds)
+        self.max_entries = int(max_entries)
+        self._entries: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+        self._db: sqlite3.Connection | None = None
+        if sqlite_path:
+            self._db = sqlite3.connect(sqlite_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses "
+                "(key TEXT PRIMARY KEY, stored_at REAL, value TEXT)"
+            )
+            self._db.commit()
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        now = time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                stored_at, value = entry
+                if now - stored_at < self.ttl_seconds:
+                    self._entries.move_to_end(key)
+                    return value
+                del self._entries[key]
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT stored_at, value FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[0] < self.ttl_seconds:
+                    value = json.loads(row[1])
+                    self._entries[key] = (row[0], value)
+                    return value
+        return None
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        now = time()
+        with self._lock:
+            self._entries[key] = (now, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                    (key, now, json.dumps(value)),
+                )
+                self._db.commit()
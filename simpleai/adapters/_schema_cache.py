@@ -0,0 +1,34 @@
+"""Memoized JSON Schema generation for Pydantic output models.
+
+``model_json_schema()`` re-traverses the model on every call; output
+formats are a small, stable set of classes, so compile each schema once
+and reuse it (and its serialized form) across calls.
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+
+
+@lru_cache(maxsize=128)
+def _schema_for(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """The JSON Schema dict for ``model_cls``, computed once per class.
+
+    Callers must treat the returned dict as immutable; copy before
+    mutating.
+    """
+    return model_cls.model_json_schema()
+
+
+@lru_cache(maxsize=128)
+def _schema_json_for(model_cls: type[BaseModel]) -> str:
+    """Canonical serialized form of :func:`_schema_for`.
+
+    Hashers and prompt builders can use the string directly instead of
+    re-serializing the dict per call.
+    """
+    return json.dumps(_schema_for(model_cls), sort_keys=True)
@@ -0,0 +1,615 @@
+"""Adapter for Anthropic's Messages API, including web search and tool output."""
+
+from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import os
+import random
+import time
+from typing import Any, Sequence
+
+from ..schema import (
+    anthropic_response_schema,
+    enforce_closed_objects,
+    strip_schema_keywords,
+)
+from .base import (
+    AdapterResponse,
+    BaseAdapter,
+    Citation,
+    ProviderError,
+    _PerLoop,
+    citation_key,
+    shared_async_http_client,
+    shared_http_client,
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None
+
+# The anthropic SDK import is heavy (httpx, pydantic-core); load it once,
+# eagerly when a key is configured, lazily on first adapter construction
+# otherwise, and keep RateLimitError at module scope so the retry loop
+# does not re-run the import system per failure.
+_anthropic = None
+_RateLimitError: type | None = None
+
+
+def _load_anthropic():
+    global _anthropic, _RateLimitError
+    if _anthropic is None:
+        import anthropic
+
+        _anthropic = anthropic
+        _RateLimitError = anthropic.RateLimitError
+    return _anthropic
+
+
+if os.environ.get("ANTHROPIC_API_KEY"):
+    try:
+        _load_anthropic()
+    except ImportError:  # pragma: no cover - optional dependency
+        pass
+
+_SYNTHESIS_INSTRUCTION = (
+    "Using the draft answer and the web search context below, produce the "
+    "final structured output with the provided tool."
+)
+_CITATION_FOLLOWUP_INSTRUCTION = (
+    "Use web search to find authoritative sources supporting the answer "
+    "below, and cite them."
+)
+
+def _get(obj: Any, key: str, default: Any = None) -> Any:
+    """Read ``key`` from either a plain dict or a typed SDK object."""
+    if isinstance(obj, dict):
+        return obj.get(key, default)
+    return getattr(obj, key, default)
+
+
+_USER_ROLE = "user"
+_TEXT_TYPE = "text"
+
+@functools.lru_cache(maxsize=64)
+def _normalized_schema_json(schema_json: str) -> str:
+    """Normalized form of the canonical-JSON schema ``schema_json``.
+
+    The per-class path goes through ``schema.anthropic_response_schema``
+    directly; this cache covers ad-hoc dict inputs, keyed on their
+    serialized form so repeat traversals are skipped.
+    """
+    return json.dumps(
+        strip_schema_keywords(enforce_closed_objects(json.loads(schema_json)))
+    )
+
+
+class AnthropicAdapter(BaseAdapter):
+    """Synchronous adapter around ``anthropic.Anthropic``.
+
+    ``run`` issues up to three calls: the initial message, an optional
+    citation follow-up (when search was requested but the first response
+    carried no web results), and an optional synthesis pass (when a
+    structured ``output_format`` must be built from searched context).
+    """
+
+    provider_name = "anthropic"
+    # No upload/document path is implemented, so attachments go through
+    # run_prompt's inline text extraction instead of arriving as paths.
+    supports_binary_files = False
+
+    # Immutable request constants; the SDK accepts any iterable of tool
+    # params, so sharing one tuple/dict across calls avoids per-request
+    # allocation.
+    _WEB_SEARCH_TOOL = ({"name": "web_search", "type": "web_search_20250305"},)
+    _TOOL_CHOICE_ANY = {"type": "any"}
+    _EPHEMERAL_CACHE = {"type": "ephemeral"}
+
+    __slots__ = ("client", "_aclients")
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        super().__init__(provider_settings)
+        try:
+            anthropic = _load_anthropic()
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ProviderError(
+                "The 'anthropic' package is required for AnthropicAdapter; "
+                "install simpleai[anthropic]."
+            ) from exc
+        api_key = self.provider_settings.get("api_key") or os.environ.get(
+            "ANTHROPIC_API_KEY"
+        )
+        # The anthropic SDK pins the httpx2 fork and rejects plain httpx
+        # clients, so the shared pool is built from that module.
+        self.client = anthropic.Anthropic(
+            api_key=api_key, http_client=shared_http_client("httpx2")
+        )
+        # Built lazily per running event loop: the async client's pooled
+        # connections (and the shared AsyncClient behind them) are
+        # loop-bound, and this adapter instance outlives any one loop.
+        self._aclients = _PerLoop(
+            lambda: anthropic.AsyncAnthropic(
+                api_key=api_key, http_client=shared_async_http_client("httpx2")
+            )
+        )
+
+    @property
+    def aclient(self) -> Any:
+        return self._aclients.get()
+
+    # ------------------------------------------------------------------
+    # Request construction
+    # ------------------------------------------------------------------
+
+    def _build_messages(
+        self, prompt: str | Sequence[Any], system_prefix: str | None = None
+    ) -> list[dict[str, Any]]:
+        if isinstance(prompt, str):
+            return [
+                {"role": _USER_ROLE, "content": [{"type": _TEXT_TYPE, "text": prompt}]}
+            ]
+        turns = prompt if isinstance(prompt, (list, tuple)) else tuple(prompt)
+        messages = [
+            {
+                "role": _USER_ROLE,
+                "content": [{"type": _TEXT_TYPE, "text": str(turn)}],
+            }
+            for turn in turns
+        ]
+        # With no cacheable system prefix, the earliest turn is the shared
+        # context; tag it so the server-side prefix cache can reuse it.
+        if (
+            system_prefix is None
+            and len(messages) > 1
+            and self.provider_settings.get("enable_prompt_cache", True)
+        ):
+            messages[0]["content"][0]["cache_control"] = self._EPHEMERAL_CACHE
+        return messages
+
+    def _prompt_as_text(self, prompt: str | Sequence[Any]) -> str:
+        if isinstance(prompt, str):
+            return prompt
+        return "\n\n".join([str(item) for item in prompt])
+
+    def _normalize_schema_for_anthropic(self, schema: dict[str, Any]) -> dict[str, Any]:
+        """A normalized copy of ``schema`` for Anthropic tool input.
+
+        Anthropic's tool-input validation wants every object closed
+        (``additionalProperties: false``) and rejects a few array keywords
+        that Pydantic emits for bounded sequences. Results are memoized on
+        the schema's canonical JSON; each call returns a fresh dict.
+        """
+        return json.loads(
+            _normalized_schema_json(json.dumps(schema, sort_keys=True))
+        )
+
+    def _build_payload(
+        self,
+        prompt: str | Sequence[Any],
+        model: str,
+        output_format: type | None,
+        require_search: bool,
+        adapter_options: dict[str, Any],
+    ) -> dict[str, Any]:
+        system_prefix = adapter_options.pop("system_prefix", None)
+        payload: dict[str, Any] = {
+            "model": model,
+            "max_tokens": int(self.provider_settings.get("max_tokens", 4096)),
+            "messages": self._build_messages(prompt, system_prefix),
+        }
+        if system_prefix is not None:
+            block: dict[str, Any] = {"type": _TEXT_TYPE, "text": system_prefix}
+            if self.provider_settings.get("enable_prompt_cache", True):
+                block["cache_control"] = self._EPHEMERAL_CACHE
+            payload["system"] = [block]
+        if require_search:
+            payload["tools"] = self._WEB_SEARCH_TOOL
+        elif output_format is not None:
+            schema = anthropic_response_schema(output_format)
+            payload["tools"] = [
+                {
+                    "name": "emit_structured_output",
+                    "description": "Emit the final answer as structured output.",
+                    "input_schema": schema,
+                }
+            ]
+            payload["tool_choice"] = self._TOOL_CHOICE_ANY
+        payload.update(adapter_options)
+        return payload
+
+    def _build_citation_followup_payload(
+        self, model: str, text: str, adapter_options: dict[str, Any]
+    ) -> dict[str, Any]:
+        prompt = f"{_CITATION_FOLLOWUP_INSTRUCTION}\n\n{text}"
+        payload = self._build_payload(prompt, model, None, True, adapter_options)
+        payload["tool_choice"] = self._TOOL_CHOICE_ANY
+        return payload
+
+    def _build_synthesis_payload(
+        self,
+        model: str,
+        output_format: type,
+        text: str,
+        search_context: str,
+        adapter_options: dict[str, Any],
+    ) -> dict[str, Any]:
+        prompt = f"{_SYNTHESIS_INSTRUCTION}\n\n{text}\n\n{search_context}"
+        return self._build_payload(prompt, model, output_format, False, adapter_options)
+
+    # ------------------------------------------------------------------
+    # Response parsing
+    # ------------------------------------------------------------------
+
+    def _parse_response(
+        self, response: Any, want_citations: bool
+    ) -> tuple[str, list[Citation], bool, str]:
+        """Walk the response content once, collecting everything ``run`` needs.
+
+        Accepts either the typed SDK response or an already-dumped dict, so
+        the hot path never pays for a full ``model_dump`` tree walk. Returns
+        ``(text, citations, has_search_result, search_context)``; the single
+        pass replaces four independent traversals of the same block list.
+        """
+        text_parts: list[str] = []
+        citations: list[Citation] = []
+        # Dedup on 64-bit citation_key digests: set membership stays O(1)
+        # instead of re-hashing kilobyte-sized snippet strings per check.
+        seen: set[int] = set()
+        has_search_result = False
+        ws_lines: list[str] = []
+
+        def append_citation(
+            url: str | None,
+            title: str | None,
+            source: str | None,
+            snippet: str | None,
+            citation_id: str | None = None,
+            start_index: int | None = None,
+            end_index: int | None = None,
+        ) -> None:
+            key = citation_key(url, title, source, snippet, start_index, end_index)
+            if key in seen:
+                return
+            seen.add(key)
+            citations.append(
+                Citation(
+                    provider=self.provider_name,
+                    url=url,
+                    title=title,
+                    source=source,
+                    snippet=snippet,
+                    citation_id=citation_id,
+                    start_index=start_index,
+                    end_index=end_index,
+                )
+            )
+
+        # Local bindings keep the hot loop to single CALL instructions
+        # instead of repeated global/attribute lookups.
+        get = _get
+        append_text = text_parts.append
+        append_ws_line = ws_lines.append
+
+        def handle_text(block: Any) -> None:
+            append_text(get(block, "text") or "")
+            if want_citations:
+                for item in get(block, "citations") or ():
+                    source = get(item, "source")
+                    source_obj = source if isinstance(source, dict) else {}
+                    append_citation(
+                        get(item, "url") or source_obj.get("url"),
+                        get(item, "title") or source_obj.get("title"),
+                        source if isinstance(source, str) else None,
+                        get(item, "cited_text"),
+                        get(item, "citation_id"),
+                        get(item, "start_index"),
+                        get(item, "end_index"),
+                    )
+
+        def handle_web_search_result(block: Any) -> None:
+            nonlocal has_search_result
+            has_search_result = True
+            for item in get(block, "content") or ():
+                url = get(item, "url")
+                title = get(item, "title")
+                append_ws_line(f"- {title or url or ''}: {url or ''}")
+                if want_citations:
+                    append_citation(url, title, get(item, "page_age"), None)
+
+        # Dispatch table instead of an if-ladder: one dict lookup per
+        # block, and unknown block types fall through for free.
+        handlers = {
+            "text": handle_text,
+            "web_search_tool_result": handle_web_search_result,
+        }
+        handlers_get = handlers.get
+        for block in get(response, "content") or ():
+            handler = handlers_get(get(block, "type"))
+            if handler is not None:
+                handler(block)
+        return (
+            "\n".join(text_parts).strip(),
+            citations,
+            has_search_result,
+            "\n".join(ws_lines),
+        )
+
+    def _extract_text(self, response: Any) -> str:
+        # Most responses are a single text block; skip the full parse and
+        # the list/join allocations for that case.
+        content = _get(response, "content") or ()
+        if len(content) == 1:
+            block = content[0]
+            if _get(block, "type") == "text":
+                return (_get(block, "text") or "").strip()
+        return self._parse_response(response, False)[0]
+
+    def _raw_for(self, response: Any) -> dict[str, Any]:
+        """Full response dump, or ``{}`` unless ``include_raw`` is set.
+
+        The whole-tree ``model_dump`` is the most allocation-heavy step of
+        parsing, so it only runs when a caller opted in.
+        """
+        if not self.provider_settings.get("include_raw", False):
+            return {}
+        return (
+            response.model_dump(mode="python")
+            if hasattr(response, "model_dump")
+            else {}
+        )
+
+    def _tool_use_text(self, response: Any) -> str:
+        for block in _get(response, "content") or ():
+            if _get(block, "type") == "tool_use" and _get(block, "input") is not None:
+                data = _get(block, "input")
+                if orjson is not None:
+                    return orjson.dumps(data, default=str).decode()
+                return json.dumps(data, ensure_ascii=True)
+        return ""
+
+    def _extract_citations(self, response: Any) -> list[Citation]:
+        return self._parse_response(response, True)[1]
+
+    def _has_web_search_result(self, response: Any) -> bool:
+        return self._parse_response(response, False)[2]
+
+    def _render_web_search_context(self, response: Any) -> str:
+        return self._parse_response(response, False)[3]
+
+    # ------------------------------------------------------------------
+    # Network calls
+    # ------------------------------------------------------------------
+
+    def _retry_sleep_seconds(self, exc: Exception, attempt: int) -> float:
+        """Equal-jitter exponential backoff, bounded by Retry-After when present.
+
+        Jitter spreads concurrent callers that hit the same 429 so their
+        retries do not land on the provider in the same second again.
+        """
+        retry_after = None
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+        if headers is not None:
+            try:
+                retry_after = float(headers.get("retry-after"))
+            except (TypeError, ValueError):
+                retry_after = None
+        base = min(retry_after if retry_after else float(2**attempt), 60.0)
+        return base / 2 + random.random() * base / 2
+
+    def _create_with_retry(
+        self, payload: dict[str, Any], stream: bool = False
+    ) -> Any:
+        max_retries = int(self.provider_settings.get("max_retries", 3))
+        for attempt in range(max_retries + 1):
+            try:
+                if stream:
+                    # Accumulated final message matches a create() result.
+                    with self.client.messages.stream(**payload) as events:
+                        return events.get_final_message()
+                return self.client.messages.create(**payload)
+            except Exception as exc:
+                if not isinstance(exc, _RateLimitError) or attempt >= max_retries:
+                    raise
+                time.sleep(self._retry_sleep_seconds(exc, attempt))
+        raise ProviderError("unreachable")  # pragma: no cover
+
+    async def _create_with_retry_async(
+        self, payload: dict[str, Any], stream: bool = False
+    ) -> Any:
+        max_retries = int(self.provider_settings.get("max_retries", 3))
+        prompt_chars = sum(
+            len(part.get("text") or "")
+            for message in payload.get("messages", ())
+            for part in message.get("content", ())
+            if isinstance(part, dict)
+        )
+        estimated = self._estimate_request_tokens(
+            prompt_chars, int(payload.get("max_tokens", 0))
+        )
+        async with self._sem:
+            for attempt in range(max_retries + 1):
+                await self._acquire_rate_slots(estimated)
+                try:
+                    if stream:
+                        async with self.aclient.messages.stream(
+                            **payload
+                        ) as events:
+                            return await events.get_final_message()
+                    return await self.aclient.messages.create(**payload)
+                except Exception as exc:
+                    if not isinstance(exc, _RateLimitError) or attempt >= max_retries:
+                        raise
+                    await asyncio.sleep(self._retry_sleep_seconds(exc, attempt))
+        raise ProviderError("unreachable")  # pragma: no cover
+
+    # ------------------------------------------------------------------
+    # Entry point
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        # Popped before the cache key: streamed and plain runs alias.
+        # The latency budget only means something to Batch-API providers;
+        # accepted and ignored so callers can set it uniformly.
+        adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        cache_key = self._response_cache_key(
+            model,
+            prompt,
+            adapter_options,
+            output_format,
+            files=files,
+            require_search=require_search,
+            return_citations=return_citations,
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        payload = self._build_payload(
+            prompt, model, output_format, require_search, adapter_options
+        )
+        # Only the primary call streams; followup/synthesis calls are
+        # short and stay on the plain endpoint.
+        response = self._create_with_retry(payload, stream=stream)
+
+        text, citations, has_search_result, search_context = self._parse_response(
+            response, return_citations
+        )
+
+        followup_payload = None
+        if require_search and return_citations and not has_search_result:
+            followup_payload = self._build_citation_followup_payload(
+                model, text, adapter_options
+            )
+        synthesis_payload = None
+        if output_format is not None and require_search:
+            synthesis_payload = self._build_synthesis_payload(
+                model, output_format, text, search_context, adapter_options
+            )
+
+        if followup_payload is not None:
+            followup = self._create_with_retry(followup_payload)
+            existing = set(citations)
+            for extra in self._extract_citations(followup):
+                if extra not in existing:
+                    citations.append(extra)
+                    existing.add(extra)
+
+        if synthesis_payload is not None:
+            synthesis = self._create_with_retry(synthesis_payload)
+            synthesis_text = self._extract_text(synthesis) or self._tool_use_text(
+                synthesis
+            )
+            if synthesis_text:
+                text = synthesis_text
+            if return_citations:
+                existing = set(citations)
+                for extra in self._extract_citations(synthesis):
+                    if extra not in existing:
+                        citations.append(extra)
+                        existing.add(extra)
+
+        if not text:
+            text = self._tool_use_text(response)
+        result = AdapterResponse(
+            text=text, citations=citations, raw=self._raw_for(response)
+        )
+        self._store_response(cache_key, result)
+        return result
+
+    async def arun(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        payload = self._build_payload(
+            prompt, model, output_format, require_search, adapter_options
+        )
+        response = await self._create_with_retry_async(payload, stream=stream)
+
+        text, citations, has_search_result, search_context = self._parse_response(
+            response, return_citations
+        )
+
+        followup_payload = None
+        if require_search and return_citations and not has_search_result:
+            followup_payload = self._build_citation_followup_payload(
+                model, text, adapter_options
+            )
+        synthesis_payload = None
+        if output_format is not None and require_search:
+            synthesis_payload = self._build_synthesis_payload(
+                model, output_format, text, search_context, adapter_options
+            )
+
+        followup = synthesis = None
+        if followup_payload is not None and synthesis_payload is not None:
+            followup, synthesis = await asyncio.gather(
+                self._create_with_retry_async(followup_payload),
+                self._create_with_retry_async(synthesis_payload),
+            )
+        elif followup_payload is not None:
+            followup = await self._create_with_retry_async(followup_payload)
+        elif synthesis_payload is not None:
+            synthesis = await self._create_with_retry_async(synthesis_payload)
+
+        if followup is not None:
+            existing = set(citations)
+            for extra in self._extract_citations(followup):
+                if extra not in existing:
+                    citations.append(extra)
+                    existing.add(extra)
+
+        if synthesis is not None:
+            synthesis_text = self._extract_text(synthesis) or self._tool_use_text(
+                synthesis
+            )
+            if synthesis_text:
+                text = synthesis_text
+            if return_citations:
+                existing = set(citations)
+                for extra in self._extract_citations(synthesis):
+                    if extra not in existing:
+                        citations.append(extra)
+                        existing.add(extra)
+
+        if not text:
+            text = self._tool_use_text(response)
+        return AdapterResponse(
+            text=text, citations=citations, raw=self._raw_for(response)
+        )
+
+
+class AsyncAnthropicAdapter(AnthropicAdapter):
+    """Async-first variant whose ``run`` awaits :meth:`AnthropicAdapter.arun`.
+
+    Kept for callers that picked the async class explicitly; the async
+    client now lives on :class:`AnthropicAdapter` itself.
+    """
+
+    __slots__ = ()
+
+    async def run(  # type: ignore[override]
+        self, prompt: str | Sequence[Any], **kwargs: Any
+    ) -> AdapterResponse:
+        return await self.arun(prompt, **kwargs)
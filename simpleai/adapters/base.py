@@ -0,0 +1,391 @@
+"""Shared adapter types: response envelope, citations, and the base class."""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import functools
+import hashlib
+import importlib
+import importlib.util
+import os
+import struct
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from time import monotonic
+from typing import Any, Callable, Sequence
+
+try:  # pragma: no cover - exercised via the fallback branch
+    import xxhash
+except ImportError:
+    xxhash = None
+
+from pydantic import BaseModel, ConfigDict, InstanceOf
+
+from ._cache import ResponseCache, response_cache_key
+
+
+class ProviderError(RuntimeError):
+    """Raised when a provider SDK is unavailable or a provider call fails."""
+
+
+class Citation(BaseModel):
+    """A single source citation attached to an adapter response.
+
+    Frozen so instances are hashable and usable directly as dedup keys.
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    provider: str
+    url: str | None = None
+    title: str | None = None
+    source: str | None = None
+    snippet: str | None = None
+    citation_id: str | None = None
+    start_index: int | None = None
+    end_index: int | None = None
+
+
+_INDEX_PACK = struct.Struct("qq").pack
+
+
+def citation_key(
+    url: str | None,
+    title: str | None,
+    source: str | None = None,
+    snippet: str | None = None,
+    start_index: int | None = None,
+    end_index: int | None = None,
+) -> int:
+    """64-bit dedup key for a citation.
+
+    Hashing into a fixed-width int keeps seen-set membership O(1) even
+    when snippets are kilobyte-sized strings. Falls back to the built-in
+    tuple hash when xxhash is not installed.
+    """
+    if xxhash is None:
+        return hash((url, title, source, snippet, start_index, end_index))
+    h = xxhash.xxh3_64()
+    update = h.update
+    for part in (url, title, source, snippet):
+        update((part or "").encode())
+        update(b"\x1f")
+    update(
+        _INDEX_PACK(
+            -1 if start_index is None else start_index,
+            -1 if end_index is None else end_index,
+        )
+    )
+    return h.intdigest()
+
+
+class AdapterResponse(BaseModel):
+    """Uniform envelope returned by every adapter's ``run``."""
+
+    text: str
+    citations: list[Citation] = []
+    # InstanceOf keeps dict subclasses (e.g. Grok's lazily-materialized
+    # proto raw) intact instead of copying them into a plain dict.
+    raw: InstanceOf[dict] = {}
+
+
+def _pool_limits(httpx: Any) -> Any:
+    return httpx.Limits(
+        max_keepalive_connections=32, max_connections=64, keepalive_expiry=30
+    )
+
+
+def _pool_timeout(httpx: Any) -> Any:
+    return httpx.Timeout(60.0, connect=10.0)
+
+
+class _PerLoop:
+    """One value per running event loop, built by ``factory`` on demand.
+
+    asyncio primitives and pooled connections bind to the loop that
+    first uses them, while callers like ``run_prompt_batch`` create a
+    fresh loop per call; keying on the loop keeps each one self-paced.
+    Weak keys let a closed loop's values be collected with it.
+    """
+
+    __slots__ = ("_factory", "_values")
+
+    def __init__(self, factory: Callable[[], Any]) -> None:
+        self._factory = factory
+        self._values: "weakref.WeakKeyDictionary[Any, Any]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def get(self) -> Any:
+        loop = asyncio.get_running_loop()
+        value = self._values.get(loop)
+        if value is None:
+            value = self._values[loop] = self._factory()
+        return value
+
+
+def _http2_available() -> bool:
+    # httpx needs the optional h2 package for HTTP/2; fall back silently.
+    return importlib.util.find_spec("h2") is not None
+
+
+@functools.lru_cache(maxsize=None)
+def shared_http_client(httpx_module: str = "httpx") -> Any:
+    """Process-wide pooled ``httpx.Client`` with keep-alive.
+
+    Passed into SDK constructors so adapter instances reuse warm
+    connections instead of paying a TLS handshake per client; HTTP/2
+    multiplexing is enabled when the ``h2`` extra is installed.
+    ``httpx_module`` names the httpx distribution to build from, for SDKs
+    that pin a fork and reject clients from plain ``httpx``.
+    """
+    httpx = importlib.import_module(httpx_module)
+    client = httpx.Client(
+        http2=_http2_available(),
+        transport=httpx.HTTPTransport(retries=2, http2=_http2_available()),
+        limits=_pool_limits(httpx),
+        timeout=_pool_timeout(httpx),
+    )
+    atexit.register(client.close)
+    return client
+
+
+_ASYNC_CLIENT_POOLS: dict[str, _PerLoop] = {}
+
+
+def _build_async_http_client(httpx_module: str) -> Any:
+    httpx = importlib.import_module(httpx_module)
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        transport=httpx.AsyncHTTPTransport(retries=2, http2=_http2_available()),
+        limits=_pool_limits(httpx),
+        timeout=_pool_timeout(httpx),
+    )
+
+
+def shared_async_http_client(httpx_module: str = "httpx") -> Any:
+    """Async twin of :func:`shared_http_client` for the ``arun`` paths.
+
+    One client per (httpx distribution, running event loop): the pool's
+    connections bind to the loop that opened them, so reusing a client
+    across loops breaks once the first loop closes. Must be called from
+    a running loop.
+    """
+    per_loop = _ASYNC_CLIENT_POOLS.get(httpx_module)
+    if per_loop is None:
+        per_loop = _ASYNC_CLIENT_POOLS[httpx_module] = _PerLoop(
+            functools.partial(_build_async_http_client, httpx_module)
+        )
+    return per_loop.get()
+
+
+# gRPC channel keepalive for SDKs (xai) that do not speak httpx.
+GRPC_KEEPALIVE_CHANNEL_OPTIONS: list[tuple[str, Any]] = [
+    ("grpc.keepalive_time_ms", 30_000),
+    ("grpc.keepalive_timeout_ms", 10_000),
+    ("grpc.http2.max_pings_without_data", 0),
+]
+
+
+def _files_fingerprint(files: Sequence[Any] | None) -> tuple:
+    """Stable identity per attachment for cache keys.
+
+    ``(name, bytes)`` blobs hash by content; path-like entries use
+    ``(path, mtime_ns, size)`` so an edited file is a cache miss without
+    re-reading it.
+    """
+    if not files:
+        return ()
+    parts: list[tuple] = []
+    for item in files:
+        if isinstance(item, tuple):
+            name, blob = item
+            parts.append((name, hashlib.sha256(blob).hexdigest()))
+        else:
+            stat = os.stat(item)
+            parts.append((str(item), stat.st_mtime_ns, stat.st_size))
+    return tuple(parts)
+
+
+class TokenBucket:
+    """Async token bucket refilled continuously at ``rate_per_min`` / minute.
+
+    ``acquire`` waits until the requested tokens are available, so callers
+    throttle themselves below the provider's RPM/TPM ceiling instead of
+    burning round-trips on 429 retries. The lock is a plain threading
+    lock - held only for the refill arithmetic, never across an await -
+    so one bucket's accounting spans threads and event loops.
+    """
+
+    __slots__ = ("rate", "capacity", "tokens", "updated", "_lock")
+
+    def __init__(self, rate_per_min: float, capacity: float | None = None) -> None:
+        self.rate = rate_per_min / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_min)
+        self.tokens = self.capacity
+        self.updated = monotonic()
+        self._lock = threading.Lock()
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        tokens = min(float(tokens), self.capacity)
+        while True:
+            with self._lock:
+                now = monotonic()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated) * self.rate
+                )
+                self.updated = now
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                wait = (tokens - self.tokens) / self.rate
+            await asyncio.sleep(wait)
+
+
+class BaseAdapter:
+    """Common scaffolding for provider adapters.
+
+    Subclasses set ``provider_name`` and implement ``run`` returning an
+    :class:`AdapterResponse`. ``provider_settings`` is the provider's section
+    of the application settings dict (api_key, model defaults, limits, ...).
+    """
+
+    provider_name: str = ""
+    supports_binary_files: bool = False
+    # When true, ``files`` may arrive as pre-read ``(name, bytes)`` pairs so
+    # bytes hashed for the episode cache are reused for upload unchanged.
+    accepts_file_blobs: bool = False
+
+    __slots__ = (
+        "provider_settings",
+        "_sems",
+        "_request_bucket",
+        "_token_bucket",
+        "_response_cache",
+        "_upload_cache",
+    )
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        self.provider_settings = dict(provider_settings or {})
+        max_concurrency = int(self.provider_settings.get("max_concurrency", 16))
+        self._sems = _PerLoop(lambda: asyncio.Semaphore(max_concurrency))
+        rpm = self.provider_settings.get("requests_per_minute")
+        self._request_bucket = TokenBucket(float(rpm)) if rpm else None
+        tpm = self.provider_settings.get("tokens_per_minute")
+        self._token_bucket = TokenBucket(float(tpm)) if tpm else None
+        self._upload_cache: dict[tuple[str, int, int], Any] = {}
+        cache_settings = self.provider_settings.get("cache") or {}
+        self._response_cache = (
+            ResponseCache(
+                ttl_seconds=float(cache_settings.get("ttl_seconds", 86_400)),
+                sqlite_path=cache_settings.get("sqlite_path"),
+            )
+            if cache_settings.get("enabled")
+            else None
+        )
+
+    def _upload_files(
+        self, files: Sequence[Any], upload: Callable[[str], Any]
+    ) -> list[Any]:
+        """Upload ``files`` concurrently, preserving input order.
+
+        Each upload is an independent I/O-bound round-trip, so N files cost
+        roughly one RTT instead of N. Results are cached per adapter by
+        ``(path, mtime_ns, size)`` so re-running the same prompt does not
+        re-upload unchanged files.
+        """
+
+        def upload_one(path: Any) -> Any:
+            resolved = str(path)
+            stat = os.stat(resolved)
+            key = (resolved, stat.st_mtime_ns, stat.st_size)
+            handle = self._upload_cache.get(key)
+            if handle is None:
+                handle = upload(resolved)
+                self._upload_cache[key] = handle
+            return handle
+
+        if len(files) == 1:
+            return [upload_one(files[0])]
+        with ThreadPoolExecutor(max_workers=min(8, len(files))) as executor:
+            return list(executor.map(upload_one, files))
+
+    def _response_cache_key(
+        self,
+        model: str,
+        prompt: Any,
+        adapter_options: dict[str, Any],
+        output_format: type | None,
+        files: Sequence[Any] | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+    ) -> str | None:
+        """Cache key for this request, or ``None`` when caching is off.
+
+        Attachments and the search/citations pair change the request, so
+        both are part of the key. Sampled responses (``temperature > 0``)
+        are never cached, since the provider is not expected to repeat
+        itself. Scope note: only the synchronous ``run`` paths of the
+        Anthropic, Gemini, and Grok adapters consult this cache; OpenAI,
+        Perplexity, and every ``arun`` always hit the network.
+        """
+        if self._response_cache is None:
+            return None
+        if float(adapter_options.get("temperature", 0) or 0) > 0:
+            return None
+        return response_cache_key(
+            self.provider_name,
+            model,
+            prompt,
+            adapter_options,
+            output_format,
+            files_fingerprint=_files_fingerprint(files),
+            require_search=require_search,
+            return_citations=return_citations,
+        )
+
+    def _cached_response(self, key: str | None) -> AdapterResponse | None:
+        if key is None or self._response_cache is None:
+            return None
+        cached = self._response_cache.get(key)
+        return AdapterResponse.model_validate(cached) if cached is not None else None
+
+    def _store_response(self, key: str | None, response: AdapterResponse) -> None:
+        if key is not None and self._response_cache is not None:
+            self._response_cache.set(key, response.model_dump())
+
+    @property
+    def _sem(self) -> asyncio.Semaphore:
+        """The concurrency semaphore for the running event loop."""
+        return self._sems.get()
+
+    async def _acquire_rate_slots(self, estimated_tokens: int) -> None:
+        if self._request_bucket is not None:
+            await self._request_bucket.acquire(1.0)
+        if self._token_bucket is not None:
+            await self._token_bucket.acquire(estimated_tokens)
+
+    @staticmethod
+    def _estimate_request_tokens(prompt_chars: int, max_tokens: int) -> int:
+        # Rough ~4 chars/token heuristic; only used for bucket accounting.
+        return max_tokens + prompt_chars // 4
+
+    def run(self, **kwargs: Any) -> AdapterResponse:
+        raise NotImplementedError
+
+    async def arun(self, *args: Any, **kwargs: Any) -> AdapterResponse:
+        raise NotImplementedError
+
+    async def run_many(
+        self, prompts: Sequence[Any], **kwargs: Any
+    ) -> list[AdapterResponse]:
+        """Fan ``arun`` out over ``prompts`` concurrently.
+
+        Wall time for N prompts drops from the sum of round-trips to
+        roughly the slowest one.
+        """
+        return list(
+            await asyncio.gather(*(self.arun(prompt, **kwargs) for prompt in prompts))
+        )
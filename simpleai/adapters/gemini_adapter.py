@@ -0,0 +1,261 @@
+"""Adapter for Google Gemini via the google-genai SDK."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Sequence
+
+from ._schema_cache import _schema_for
+from .base import AdapterResponse, BaseAdapter, Citation, ProviderError, citation_key
+
+# Lazy module cache: the SDK import is paid once per process, on first
+# adapter construction, instead of per __init__.
+_genai = None
+
+
+def _load_genai():
+    global _genai
+    if _genai is None:
+        try:
+            from google import genai
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ProviderError(
+                "The 'google-genai' package is required for GeminiAdapter; "
+                "install simpleai[gemini]."
+            ) from exc
+        _genai = genai
+    return _genai
+
+
+class GeminiAdapter(BaseAdapter):
+    """Adapter around ``google.genai.Client``.
+
+    Files are uploaded through the Files API and referenced from the
+    request contents; grounded responses surface their sources through
+    ``grounding_metadata`` on each candidate.
+    """
+
+    provider_name = "gemini"
+    supports_binary_files = True
+
+    __slots__ = ("client",)
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        super().__init__(provider_settings)
+        genai = _load_genai()
+        api_key = (
+            self.provider_settings.get("api_key")
+            or os.environ.get("GEMINI_API_KEY")
+            or os.environ.get("GOOGLE_API_KEY")
+        )
+        import httpx
+
+        limits = httpx.Limits(
+            max_keepalive_connections=32, max_connections=64, keepalive_expiry=60
+        )
+        self.client = genai.Client(
+            api_key=api_key,
+            http_options={
+                "client_args": {
+                    "limits": limits,
+                    "transport": httpx.HTTPTransport(retries=2),
+                },
+                "async_client_args": {
+                    "limits": limits,
+                    "transport": httpx.AsyncHTTPTransport(retries=2),
+                },
+            },
+        )
+
+    # ------------------------------------------------------------------
+    # Request construction
+    # ------------------------------------------------------------------
+
+    def _build_contents(
+        self, prompt: str | Sequence[Any], files: Sequence[Any] | None
+    ) -> list[Any]:
+        contents: list[Any] = []
+        if files:
+            contents.extend(
+                self._upload_files(
+                    files, lambda path: self.client.files.upload(file=path)
+                )
+            )
+        if isinstance(prompt, str):
+            contents.append(prompt)
+        else:
+            for turn in prompt:
+                contents.append(str(turn))
+        return contents
+
+    def _build_request(
+        self,
+        prompt: str | Sequence[Any],
+        model: str,
+        output_format: type | None,
+        require_search: bool,
+        files: Sequence[Any] | None,
+        adapter_options: dict[str, Any],
+    ) -> dict[str, Any]:
+        config: dict[str, Any] = {}
+        if output_format is not None:
+            config["response_mime_type"] = "application/json"
+            config["response_schema"] = _schema_for(output_format)
+        if require_search:
+            config["tools"] = [{"google_search": {}}]
+        config.update(adapter_options)
+        request: dict[str, Any] = {
+            "model": model,
+            "contents": self._build_contents(prompt, files),
+        }
+        if config:
+            request["config"] = config
+        return request
+
+    # ------------------------------------------------------------------
+    # Response parsing
+    # ------------------------------------------------------------------
+
+    # snake_case/camelCase alias pairs resolved with a single membership
+    # probe instead of chained .get() fallbacks per node.
+    _ALIASES = {
+        "grounding_metadata": "groundingMetadata",
+        "grounding_chunks": "groundingChunks",
+    }
+
+    @staticmethod
+    def _aliased(node: dict[str, Any], key: str) -> Any:
+        return node.get(key) if key in node else node.get(GeminiAdapter._ALIASES[key])
+
+    def _extract_citations(self, response_dict: dict[str, Any]) -> list[Citation]:
+        citations: list[Citation] = []
+        seen: set[int] = set()
+        aliased = self._aliased
+        for candidate in response_dict.get("candidates") or []:
+            metadata = aliased(candidate, "grounding_metadata") or {}
+            chunks = aliased(metadata, "grounding_chunks") or []
+            for chunk in chunks:
+                web = chunk.get("web") or {}
+                url = web.get("uri")
+                title = web.get("title")
+                key = citation_key(url, title)
+                if key in seen:
+                    continue
+                seen.add(key)
+                citations.append(
+                    Citation(provider=self.provider_name, url=url, title=title)
+                )
+        return citations
+
+    def _finish(self, response: Any, return_citations: bool) -> AdapterResponse:
+        text = getattr(response, "text", "") or ""
+        # Defer the whole-tree dump: when response.text is populated and no
+        # citations were asked for, the dict is never needed.
+        response_dict: dict[str, Any] | None = None
+        if not text or return_citations or self.provider_settings.get(
+            "include_raw", False
+        ):
+            response_dict = (
+                response.model_dump(mode="json")
+                if hasattr(response, "model_dump")
+                else {}
+            )
+        if not text and response_dict:
+            chunks: list[str] = []
+            for candidate in response_dict.get("candidates") or []:
+                content = candidate.get("content") or {}
+                for part in content.get("parts") or []:
+                    if part.get("text"):
+                        chunks.append(part["text"])
+            text = "".join(chunks)
+        citations = self._extract_citations(response_dict) if return_citations else []
+        raw = (
+            response_dict
+            if response_dict is not None
+            and self.provider_settings.get("include_raw", False)
+            else {}
+        )
+        return AdapterResponse(text=text, citations=citations, raw=raw)
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        # Popped before the cache key: streamed and plain runs alias.
+        # The latency budget only means something to Batch-API providers;
+        # accepted and ignored so callers can set it uniformly.
+        adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        cache_key = self._response_cache_key(
+            model,
+            prompt,
+            adapter_options,
+            output_format,
+            files=files,
+            require_search=require_search,
+            return_citations=return_citations,
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        request = self._build_request(
+            prompt, model, output_format, require_search, files, adapter_options
+        )
+        if stream and not return_citations:
+            # Citations need the grounding metadata of a full response;
+            # plain runs can concatenate the streamed text directly.
+            text = "".join(
+                chunk.text or ""
+                for chunk in self.client.models.generate_content_stream(
+                    **request
+                )
+            )
+            result = AdapterResponse(text=text, citations=[], raw={})
+        else:
+            response = self.client.models.generate_content(**request)
+            result = self._finish(response, return_citations)
+        self._store_response(cache_key, result)
+        return result
+
+    async def arun(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        request = self._build_request(
+            prompt, model, output_format, require_search, files, adapter_options
+        )
+        estimated = self._estimate_request_tokens(
+            len(str(prompt)), int(adapter_options.get("max_output_tokens", 1024))
+        )
+        async with self._sem:
+            await self._acquire_rate_slots(estimated)
+            if stream and not return_citations:
+                chunks: list[str] = []
+                async for chunk in await (
+                    self.client.aio.models.generate_content_stream(**request)
+                ):
+                    if chunk.text:
+                        chunks.append(chunk.text)
+                return AdapterResponse(text="".join(chunks), citations=[], raw={})
+            response = await self.client.aio.models.generate_content(**request)
+        return self._finish(response, return_citations)
@@ -0,0 +1,283 @@
+"""Adapter for xAI Grok via the xai_sdk chat API."""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Sequence
+
+from ._schema_cache import _schema_json_for
+from .base import (
+    GRPC_KEEPALIVE_CHANNEL_OPTIONS,
+    AdapterResponse,
+    BaseAdapter,
+    Citation,
+    ProviderError,
+)
+
+_SCHEMA_INSTRUCTION = (
+    "Respond with JSON only, matching this schema:\n{schema}"
+)
+
+# Lazy module cache, mirroring the other adapters: pay the SDK import
+# once per process rather than per __init__.
+_xai_sdk = None
+_chat_helpers = None
+
+
+def _load_xai_sdk():
+    global _xai_sdk, _chat_helpers
+    if _xai_sdk is None:
+        try:
+            import xai_sdk
+            from xai_sdk import chat as chat_helpers
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ProviderError(
+                "The 'xai-sdk' package is required for GrokAdapter; "
+                "install simpleai[grok]."
+            ) from exc
+        _xai_sdk = xai_sdk
+        _chat_helpers = chat_helpers
+    return _xai_sdk
+
+
+class _LazyRaw(dict):
+    """Raw-response dict that defers the proto conversion until read.
+
+    ``MessageToDict`` walks the whole protobuf tree allocating Python
+    objects; most callers never read ``raw["proto"]``, so the conversion
+    only happens on first access.
+    """
+
+    __slots__ = ("_proto",)
+
+    def __init__(self, proto: Any) -> None:
+        super().__init__()
+        self._proto = proto
+
+    def _materialize(self) -> None:
+        if "proto" not in self.keys():
+            from google.protobuf.json_format import MessageToDict
+
+            super().__setitem__(
+                "proto",
+                MessageToDict(
+                    self._proto,
+                    preserving_proto_field_name=True,
+                    use_integers_for_enums=True,
+                ),
+            )
+
+    def __getitem__(self, key: str) -> Any:
+        self._materialize()
+        return super().__getitem__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        self._materialize()
+        return super().get(key, default)
+
+
+class GrokAdapter(BaseAdapter):
+    """Adapter around ``xai_sdk.Client``'s chat interface.
+
+    Messages are assembled with the SDK's chat helpers; file attachments
+    are uploaded first and appended to the final user turn.
+    """
+
+    provider_name = "grok"
+    supports_binary_files = True
+
+    __slots__ = ("client", "aclient", "chat_helpers")
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        super().__init__(provider_settings)
+        xai_sdk = _load_xai_sdk()
+        api_key = (
+            self.provider_settings.get("api_key")
+            or os.environ.get("XAI_API_KEY")
+            or os.environ.get("GROK_API_KEY")
+        )
+        self.client = xai_sdk.Client(
+            api_key=api_key, channel_options=GRPC_KEEPALIVE_CHANNEL_OPTIONS
+        )
+        self.aclient = xai_sdk.AsyncClient(
+            api_key=api_key, channel_options=GRPC_KEEPALIVE_CHANNEL_OPTIONS
+        )
+        self.chat_helpers = _chat_helpers
+
+    # ------------------------------------------------------------------
+    # Request construction
+    # ------------------------------------------------------------------
+
+    def _build_messages(
+        self,
+        prompt: str | Sequence[Any],
+        output_format: type | None,
+        files: Sequence[Any] | None,
+        system_prefix: str | None = None,
+    ) -> list[Any]:
+        attachments: list[Any] = []
+        if files:
+            attachments = self._upload_files(
+                files, lambda path: self.client.files.upload(file=path)
+            )
+        turns = (
+            (prompt,)
+            if isinstance(prompt, str)
+            else prompt
+            if isinstance(prompt, (list, tuple))
+            else tuple(prompt)
+        )
+        if output_format is not None:
+            turns = (
+                *turns,
+                _SCHEMA_INSTRUCTION.format(schema=_schema_json_for(output_format)),
+            )
+        messages: list[Any] = []
+        # xAI's prefix cache is automatic; keeping a stable shared preamble
+        # as its own leading system message maximizes the cacheable prefix.
+        if system_prefix is not None and self.provider_settings.get(
+            "enable_prompt_cache", True
+        ):
+            messages.append(self.chat_helpers.system(system_prefix))
+        user = self.chat_helpers.user
+        append = messages.append
+        last = len(turns) - 1
+        for i, turn in enumerate(turns):
+            if i == last and attachments:
+                append(user(str(turn), *attachments))
+            else:
+                append(user(str(turn)))
+        return messages
+
+    def _chat_kwargs(
+        self, model: str, require_search: bool, adapter_options: dict[str, Any]
+    ) -> dict[str, Any]:
+        kwargs: dict[str, Any] = {"model": model}
+        if require_search:
+            kwargs["search_parameters"] = self.chat_helpers.SearchParameters(
+                mode="auto"
+            )
+        kwargs.update(adapter_options)
+        return kwargs
+
+    # ------------------------------------------------------------------
+    # Response parsing
+    # ------------------------------------------------------------------
+
+    def _extract_citations(self, response: Any) -> list[Citation]:
+        citations: list[Citation] = []
+        seen: set[str | None] = set()
+        for url in getattr(response, "citations", None) or []:
+            if url in seen:
+                continue
+            seen.add(url)
+            citations.append(Citation(provider=self.provider_name, url=url))
+        for inline in getattr(response, "inline_citations", None) or []:
+            web = getattr(inline, "web_citation", None)
+            url = getattr(web, "url", None) if web is not None else None
+            if url is None or url in seen:
+                continue
+            seen.add(url)
+            citations.append(Citation(provider=self.provider_name, url=url))
+        return citations
+
+    def _raw_response(self, response: Any) -> dict[str, Any]:
+        if not self.provider_settings.get("include_proto_raw", False):
+            return {}
+        proto = getattr(response, "proto", None)
+        if proto is None:
+            return {}
+        return _LazyRaw(proto)
+
+    def _finish(self, response: Any, return_citations: bool) -> AdapterResponse:
+        text = getattr(response, "content", "") or ""
+        citations = self._extract_citations(response) if return_citations else []
+        return AdapterResponse(
+            text=text, citations=citations, raw=self._raw_response(response)
+        )
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        # Popped before the cache key: streamed and plain runs alias.
+        # The latency budget only means something to Batch-API providers;
+        # accepted and ignored so callers can set it uniformly.
+        adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        cache_key = self._response_cache_key(
+            model,
+            prompt,
+            adapter_options,
+            output_format,
+            files=files,
+            require_search=require_search,
+            return_citations=return_citations,
+        )
+        cached = self._cached_response(cache_key)
+        if cached is not None:
+            return cached
+        system_prefix = adapter_options.pop("system_prefix", None)
+        chat = self.client.chat.create(
+            **self._chat_kwargs(model, require_search, adapter_options)
+        )
+        for message in self._build_messages(
+            prompt, output_format, files, system_prefix
+        ):
+            chat.append(message)
+        if stream:
+            # chat.stream() yields (accumulated_response, chunk) pairs;
+            # draining it leaves the full response in hand.
+            response = None
+            for response, _ in chat.stream():
+                pass
+        else:
+            response = chat.sample()
+        result = self._finish(response, return_citations)
+        self._store_response(cache_key, result)
+        return result
+
+    async def arun(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        adapter_options.pop("latency_budget_ms", None)
+        system_prefix = adapter_options.pop("system_prefix", None)
+        stream = adapter_options.pop("stream", False)
+        chat = self.aclient.chat.create(
+            **self._chat_kwargs(model, require_search, adapter_options)
+        )
+        for message in self._build_messages(
+            prompt, output_format, files, system_prefix
+        ):
+            chat.append(message)
+        estimated = self._estimate_request_tokens(
+            len(str(prompt)), int(adapter_options.get("max_tokens", 1024))
+        )
+        async with self._sem:
+            await self._acquire_rate_slots(estimated)
+            if stream:
+                response = None
+                async for response, _ in chat.stream():
+                    pass
+            else:
+                response = await chat.sample()
+        return self._finish(response, return_citations)
@@ -0,0 +1,455 @@
+"""Adapter for OpenAI's Responses API, including web search and file input."""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import io
+import os
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Sequence
+
+from ..cache import ExtractionCache
+from ..dispatcher import FleetDispatcher
+from ..schema import openai_response_schema
+from .base import (
+    AdapterResponse,
+    BaseAdapter,
+    Citation,
+    ProviderError,
+    _PerLoop,
+    shared_async_http_client,
+    shared_http_client,
+)
+
+
+@lru_cache(maxsize=128)
+def _cached_openai_schema(cls: type) -> dict[str, Any]:
+    """Memoized ``openai_response_schema``; model classes are hashable."""
+    return openai_response_schema(cls)
+
+# Client classes cached on first touch so importing this module (or
+# instantiating another provider's adapter) never pays the openai import.
+_OPENAI_CLASSES: tuple[type, type] | None = None
+
+
+def _load_openai() -> tuple[type, type]:
+    global _OPENAI_CLASSES
+    if _OPENAI_CLASSES is None:
+        try:
+            from openai import AsyncOpenAI, OpenAI
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ProviderError(
+                "The 'openai' package is required for OpenAIAdapter; "
+                "install simpleai[openai]."
+            ) from exc
+        _OPENAI_CLASSES = (OpenAI, AsyncOpenAI)
+    return _OPENAI_CLASSES
+
+
+_RATELIMIT_HEADERS = [
+    "x-ratelimit-limit-requests",
+    "x-ratelimit-limit-tokens",
+    "x-ratelimit-remaining-requests",
+]
+
+
+def format_provider_error(exc: BaseException) -> str:
+    """Human-readable failure message, including rate-limit headers if any."""
+    msg = f"OpenAI adapter failed: {exc}"
+    headers = getattr(getattr(exc, "response", None), "headers", None) or {}
+    details = []
+    for key in _RATELIMIT_HEADERS:
+        if headers.get(key) is not None:
+            details.append(f"{key}: {headers.get(key)}")
+    if details:
+        msg += "\n\nRate limit headers:\n" + "\n".join(details)
+    return msg
+
+
+class OpenAIAdapter(BaseAdapter):
+    """Adapter around ``openai.OpenAI``'s Responses interface.
+
+    Files are uploaded through the Files API and referenced as
+    ``input_file`` parts; web search citations surface as ``url_citation``
+    annotations on output text.
+    """
+
+    provider_name = "openai"
+    supports_binary_files = True
+    accepts_file_blobs = True
+
+    __slots__ = ("client", "_async_clients", "_dispatchers", "_file_id_cache")
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        super().__init__(provider_settings)
+        openai_cls, async_openai_cls = _load_openai()
+        api_key = self.provider_settings.get("api_key") or os.environ.get(
+            "OPENAI_API_KEY"
+        )
+        # Shared pooled transports: keep-alive connections are reused
+        # across adapter instances instead of re-handshaking per client.
+        self.client = openai_cls(api_key=api_key, http_client=shared_http_client())
+        # Built lazily per running event loop: the async client's pooled
+        # connections are loop-bound, and this adapter instance outlives
+        # any one loop.
+        self._async_clients = _PerLoop(
+            lambda: async_openai_cls(
+                api_key=api_key, http_client=shared_async_http_client()
+            )
+        )
+        # Dispatcher state (pending futures, flusher task) is loop-bound
+        # too: futures from one loop must never be settled by another.
+        self._dispatchers = _PerLoop(self._build_dispatcher)
+        cache_dir = self.provider_settings.get("cache_dir")
+        self._file_id_cache = ExtractionCache(cache_dir) if cache_dir else None
+
+    @property
+    def async_client(self) -> Any:
+        return self._async_clients.get()
+
+    def _sync_max_latency_ms(self) -> int:
+        """Budgets above this threshold route through the Batch API."""
+        batch_settings = self.provider_settings.get("batch") or {}
+        return int(batch_settings.get("sync_max_latency_ms", 30_000))
+
+    def _build_dispatcher(self) -> FleetDispatcher:
+        batch_settings = self.provider_settings.get("batch") or {}
+        return FleetDispatcher(
+            self,
+            sync_max_latency_ms=self._sync_max_latency_ms(),
+            batch_window_ms=int(batch_settings.get("window_ms", 2_000)),
+            batch_min_size=int(batch_settings.get("min_size", 1)),
+        )
+
+    def batch_dispatcher(self) -> FleetDispatcher:
+        """The Batch API dispatcher for the running event loop."""
+        return self._dispatchers.get()
+
+    # ------------------------------------------------------------------
+    # Request construction
+    # ------------------------------------------------------------------
+
+    def _cached_file_id(self, data: bytes) -> tuple[str | None, str | None]:
+        """Content hash and any still-valid provider file id for ``data``."""
+        cache = self._file_id_cache
+        if cache is None:
+            return None, None
+        sha = hashlib.sha256(data).hexdigest()
+        return sha, cache.get_file_id(sha)
+
+    def _upload_files(self, files: Sequence[Any]) -> list[str]:
+        file_ids: list[str] = []
+        for item in files:
+            if isinstance(item, tuple):
+                # Pre-read (name, bytes) pair: the caller already has the
+                # bytes in memory (e.g. for cache hashing), reuse them.
+                name, data = item
+            else:
+                path = Path(item)
+                name, data = path.name, path.read_bytes()
+            sha, cached_id = self._cached_file_id(data)
+            if cached_id is not None:
+                file_ids.append(cached_id)
+                continue
+            buffer = io.BytesIO(data)
+            buffer.name = name
+            uploaded = self.client.files.create(
+                file=buffer, purpose="user_data"
+            )
+            if sha is not None:
+                self._file_id_cache.put_file_id(sha, uploaded.id)
+            file_ids.append(uploaded.id)
+        return file_ids
+
+    async def _aupload_files(self, files: Sequence[Any]) -> list[str]:
+        """Read and upload all files concurrently through the async client.
+
+        Reads happen off-loop in threads and uploads overlap on the shared
+        event loop, so N files cost roughly one read-plus-upload instead
+        of N serialized round trips.
+        """
+
+        async def upload(item: Any) -> str:
+            if isinstance(item, tuple):
+                name, data = item
+            else:
+                path = Path(item)
+                name = path.name
+                data = await asyncio.to_thread(path.read_bytes)
+            sha, cached_id = self._cached_file_id(data)
+            if cached_id is not None:
+                return cached_id
+            uploaded = await self.async_client.files.create(
+                file=(name, data), purpose="user_data"
+            )
+            if sha is not None:
+                self._file_id_cache.put_file_id(sha, uploaded.id)
+            return uploaded.id
+
+        return list(await asyncio.gather(*(upload(item) for item in files)))
+
+    def _build_input(
+        self, prompt: str | Sequence[Any], file_ids: Sequence[str]
+    ) -> list[dict[str, Any]]:
+        # Fast path: the overwhelmingly common single-string, no-files call
+        # builds its one message directly.
+        if isinstance(prompt, str) and not file_ids:
+            return [
+                {
+                    "role": "user",
+                    "content": [{"type": "input_text", "text": prompt}],
+                }
+            ]
+        turns: Sequence[Any] = (prompt,) if isinstance(prompt, str) else prompt
+        messages: list[Any] = [None] * len(turns)
+        for index, turn in enumerate(turns):
+            messages[index] = {
+                "role": "user",
+                "content": [{"type": "input_text", "text": str(turn)}],
+            }
+        if not messages:
+            messages = [{"role": "user", "content": []}]
+        if file_ids:
+            content = messages[0]["content"]
+            for file_id in file_ids:
+                content.append({"type": "input_file", "file_id": file_id})
+        return messages
+
+    def _build_payload(
+        self,
+        prompt: str | Sequence[Any],
+        model: str,
+        output_format: type | None,
+        require_search: bool,
+        file_ids: Sequence[str],
+        adapter_options: dict[str, Any],
+    ) -> dict[str, Any]:
+        payload: dict[str, Any] = {
+            "model": model,
+            "input": self._build_input(prompt, file_ids),
+        }
+        if output_format is not None:
+            payload["text"] = {"format": _cached_openai_schema(output_format)}
+        if require_search:
+            payload["tools"] = [{"type": "web_search"}]
+        payload.update(adapter_options)
+        return payload
+
+    # ------------------------------------------------------------------
+    # Response parsing
+    # ------------------------------------------------------------------
+
+    def _handle_message(
+        self, output: dict[str, Any], append_citation: Any, chunks: list[str]
+    ) -> None:
+        for part in output.get("content") or []:
+            if part.get("type") == "output_text" and part.get("text"):
+                chunks.append(part["text"])
+            if append_citation is None:
+                continue
+            for annotation in part.get("annotations") or []:
+                if annotation.get("type") != "url_citation":
+                    continue
+                append_citation(
+                    annotation.get("url"),
+                    annotation.get("title"),
+                    None,
+                    annotation.get("start_index"),
+                    annotation.get("end_index"),
+                )
+
+    def _handle_search_call(
+        self, output: dict[str, Any], append_citation: Any, chunks: list[str]
+    ) -> None:
+        if append_citation is None:
+            return
+        action = output.get("action") or {}
+        for source in action.get("sources") or []:
+            url = source if isinstance(source, str) else source.get("url")
+            append_citation(url, None, "web_search")
+
+    # Single-pass dispatch over output blocks, keyed by block type.
+    _HANDLERS = {
+        "message": _handle_message,
+        "web_search_call": _handle_search_call,
+    }
+
+    def _parse_output(
+        self, response_dict: dict[str, Any], want_citations: bool
+    ) -> tuple[str, list[Citation]]:
+        """One walk over ``output`` yields both text and citations."""
+        chunks: list[str] = []
+        citations: list[Citation] = []
+        # dict used as an ordered set: O(1) membership, insertion order kept.
+        # Keys are the tuple's 64-bit hash rather than the tuple itself, so
+        # long URLs/titles are hashed once and membership checks compare
+        # ints (the 2^-32 birthday collision risk is acceptable here).
+        seen: dict[int, None] = {}
+
+        def append_citation(
+            url: str | None,
+            title: str | None,
+            source: str | None,
+            start_index: int | None = None,
+            end_index: int | None = None,
+        ) -> None:
+            key = hash((url, title, source, start_index, end_index))
+            if key in seen:
+                return
+            seen[key] = None
+            citations.append(
+                Citation(
+                    provider=self.provider_name,
+                    url=url,
+                    title=title,
+                    source=source,
+                    start_index=start_index,
+                    end_index=end_index,
+                )
+            )
+
+        emit = append_citation if want_citations else None
+        handlers = self._HANDLERS
+        for output in response_dict.get("output") or ():
+            handler = handlers.get(output.get("type"))
+            if handler is not None:
+                handler(self, output, emit, chunks)
+        return "".join(chunks), citations
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        latency_budget_ms = adapter_options.pop("latency_budget_ms", None)
+        stream = adapter_options.pop("stream", False)
+        if (
+            latency_budget_ms is not None
+            and latency_budget_ms > self._sync_max_latency_ms()
+        ):
+            # Loose budget: route through the Batch API for the discount.
+            # Owns its own event loop, so only valid from synchronous code.
+            return asyncio.run(
+                self.arun(
+                    prompt,
+                    model=model,
+                    output_format=output_format,
+                    require_search=require_search,
+                    return_citations=return_citations,
+                    files=files,
+                    latency_budget_ms=latency_budget_ms,
+                    stream=stream,
+                    **adapter_options,
+                )
+            )
+        file_ids = self._upload_files(files) if files else []
+        payload = self._build_payload(
+            prompt, model, output_format, require_search, file_ids, adapter_options
+        )
+        try:
+            if stream:
+                # Drain the SSE stream so tokens arrive as generated; the
+                # accumulated final response is identical to a create().
+                with self.client.responses.stream(**payload) as events:
+                    for _ in events:
+                        pass
+                    response = events.get_final_response()
+            else:
+                response = self.client.responses.create(**payload)
+        except Exception as exc:
+            raise ProviderError(format_provider_error(exc)) from exc
+        return self._finish(response, return_citations)
+
+    async def arun(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        latency_budget_ms = adapter_options.pop("latency_budget_ms", None)
+        # Streaming is pointless through the Batch API; popped either way
+        # so the flag never leaks into the request payload.
+        stream = adapter_options.pop("stream", False)
+        file_ids = await self._aupload_files(files) if files else []
+        payload = self._build_payload(
+            prompt, model, output_format, require_search, file_ids, adapter_options
+        )
+        if (
+            latency_budget_ms is not None
+            and latency_budget_ms > self._sync_max_latency_ms()
+        ):
+            future = await self.batch_dispatcher().submit(
+                latency_budget_ms=latency_budget_ms, payload=payload
+            )
+            try:
+                response = await future
+            except ProviderError:
+                raise
+            except Exception as exc:
+                raise ProviderError(format_provider_error(exc)) from exc
+            return self._finish(response, return_citations)
+        estimated = self._estimate_request_tokens(
+            len(str(prompt)), int(adapter_options.get("max_output_tokens", 1024))
+        )
+        async with self._sem:
+            await self._acquire_rate_slots(estimated)
+            try:
+                if stream:
+                    async with self.async_client.responses.stream(
+                        **payload
+                    ) as events:
+                        async for _ in events:
+                            pass
+                        response = await events.get_final_response()
+                else:
+                    response = await self.async_client.responses.create(
+                        **payload
+                    )
+            except Exception as exc:
+                raise ProviderError(format_provider_error(exc)) from exc
+        return self._finish(response, return_citations)
+
+    def _finish(self, response: Any, return_citations: bool) -> AdapterResponse:
+        include_raw = self.provider_settings.get("include_raw", False)
+        if isinstance(response, dict):
+            # Batch API results arrive as plain response-body dicts.
+            response_dict: dict[str, Any] | None = response
+            text = ""
+        else:
+            text = getattr(response, "output_text", "") or ""
+            # The full dump is only needed to recover missing text, parse
+            # citations, or expose raw output; skip the serialization walk
+            # on the common plain-text path.
+            response_dict = None
+            if not text or return_citations or include_raw:
+                response_dict = (
+                    response.model_dump(mode="json")
+                    if hasattr(response, "model_dump")
+                    else {}
+                )
+        citations: list[Citation] = []
+        if response_dict is not None and (not text or return_citations):
+            parsed_text, citations = self._parse_output(
+                response_dict, return_citations
+            )
+            if not text:
+                text = parsed_text
+        raw = response_dict if include_raw and response_dict is not None else {}
+        return AdapterResponse(text=text, citations=citations, raw=raw)
@@ -0,0 +1,240 @@
+"""Adapter for Perplexity's Sonar chat API."""
+
+from __future__ import annotations
+
+import os
+import re
+from functools import lru_cache
+from typing import Any, Sequence
+
+from ..schema import perplexity_response_schema
+from .base import (
+    AdapterResponse,
+    BaseAdapter,
+    Citation,
+    ProviderError,
+    _PerLoop,
+    shared_async_http_client,
+    shared_http_client,
+)
+
+
+@lru_cache(maxsize=128)
+def _cached_json_schema(cls: type) -> dict[str, Any]:
+    """Memoized ``perplexity_response_schema``; model classes are hashable."""
+    return perplexity_response_schema(cls)
+
+_PERPLEXITY_CLASSES: tuple[type, type] | None = None
+
+
+def _load_perplexity() -> tuple[type, type]:
+    global _PERPLEXITY_CLASSES
+    if _PERPLEXITY_CLASSES is None:
+        try:
+            from perplexity import AsyncPerplexity, Perplexity
+        except ImportError as exc:  # pragma: no cover - import guard
+            raise ProviderError(
+                "The 'perplexityai' package is required for PerplexityAdapter; "
+                "install simpleai[perplexity]."
+            ) from exc
+        _PERPLEXITY_CLASSES = (Perplexity, AsyncPerplexity)
+    return _PERPLEXITY_CLASSES
+
+
+_PRESET_ALIASES = {
+    "sonar": "sonar",
+    "sonar-pro": "sonar-pro",
+    "sonar-reasoning": "sonar-reasoning",
+    "sonar-reasoning-pro": "sonar-reasoning-pro",
+    "sonar-deep-research": "sonar-deep-research",
+}
+
+# One C-level DFA step replaces the chain of startswith branches; the map
+# routes each foreign model family to the closest Sonar target.
+_PREFIX_RE = re.compile(r"^(gpt-|o1|o3|o4|claude|gemini|grok|sonar)", re.I)
+_PREFIX_TO_TARGET = {
+    "gpt-": "sonar-pro",
+    "o1": "sonar-reasoning-pro",
+    "o3": "sonar-reasoning-pro",
+    "o4": "sonar-reasoning-pro",
+    "claude": "sonar-pro",
+    "gemini": "sonar-pro",
+    "grok": "sonar-pro",
+}
+
+
+@lru_cache(maxsize=256)
+def _resolve_model_target(model: str) -> str:
+    normalized = model.strip().lower()
+    preset = _PRESET_ALIASES.get(normalized)
+    if preset is not None:
+        return preset
+    match = _PREFIX_RE.match(normalized)
+    if match is None:
+        return "sonar"
+    prefix = match.group(1)
+    if prefix == "sonar":
+        return normalized
+    return _PREFIX_TO_TARGET[prefix]
+
+
+class PerplexityAdapter(BaseAdapter):
+    """Adapter around ``perplexity.Perplexity``'s chat completions.
+
+    Perplexity only serves its own Sonar models; model names belonging to
+    other vendors are mapped to the closest Sonar target. Search results
+    arrive alongside the completion and become citations.
+    """
+
+    provider_name = "perplexity"
+
+    __slots__ = ("client", "_async_clients")
+
+    def __init__(self, provider_settings: dict[str, Any] | None = None) -> None:
+        super().__init__(provider_settings)
+        perplexity_cls, async_perplexity_cls = _load_perplexity()
+        api_key = self.provider_settings.get("api_key") or os.environ.get(
+            "PERPLEXITY_API_KEY"
+        )
+        self.client = perplexity_cls(
+            api_key=api_key, http_client=shared_http_client()
+        )
+        # Built lazily per running event loop: the async client's pooled
+        # connections are loop-bound, and this adapter instance outlives
+        # any one loop.
+        self._async_clients = _PerLoop(
+            lambda: async_perplexity_cls(
+                api_key=api_key, http_client=shared_async_http_client()
+            )
+        )
+
+    @property
+    def async_client(self) -> Any:
+        return self._async_clients.get()
+
+    # ------------------------------------------------------------------
+    # Request construction
+    # ------------------------------------------------------------------
+
+    _resolve_model_target = staticmethod(_resolve_model_target)
+
+    def _build_messages(self, prompt: str | Sequence[Any]) -> list[dict[str, Any]]:
+        if isinstance(prompt, str):
+            return [{"role": "user", "content": prompt}]
+        return [{"role": "user", "content": str(turn)} for turn in prompt]
+
+    # ------------------------------------------------------------------
+    # Response parsing
+    # ------------------------------------------------------------------
+
+    def _extract_citations(self, response_dict: dict[str, Any]) -> list[Citation]:
+        # Collect plain dicts first, then build the models in one pass with
+        # model_construct: the fields are already the right shapes, so the
+        # per-citation validation walk is pure overhead.
+        fields: list[dict[str, Any]] = []
+        seen: set[tuple[Any, ...]] = set()
+        provider = self.provider_name
+        for result in response_dict.get("search_results") or []:
+            url = result.get("url")
+            title = result.get("title")
+            key = (url, title)
+            if key in seen:
+                continue
+            seen.add(key)
+            fields.append({"provider": provider, "url": url, "title": title})
+        for url in response_dict.get("citations") or []:
+            key = (url, None)
+            if key in seen:
+                continue
+            seen.add(key)
+            fields.append({"provider": provider, "url": url})
+        return [Citation.model_construct(**item) for item in fields]
+
+    # ------------------------------------------------------------------
+    # Entry points
+    # ------------------------------------------------------------------
+
+    def run(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        # Perplexity has no Batch API, and citations come only with the
+        # full response; the budget and stream hints are accepted and
+        # ignored so callers can set them uniformly across providers.
+        adapter_options.pop("latency_budget_ms", None)
+        adapter_options.pop("stream", None)
+        if files:
+            raise ProviderError(
+                "PerplexityAdapter does not support file attachments."
+            )
+        payload: dict[str, Any] = {
+            "model": self._resolve_model_target(model),
+            "messages": self._build_messages(prompt),
+        }
+        if output_format is not None:
+            payload["response_format"] = _cached_json_schema(output_format)
+        payload.update(adapter_options)
+        response = self.client.chat.completions.create(**payload)
+        return self._finish(response, return_citations)
+
+    async def arun(
+        self,
+        prompt: str | Sequence[Any],
+        *,
+        model: str,
+        output_format: type | None = None,
+        require_search: bool = False,
+        return_citations: bool = False,
+        files: Sequence[Any] | None = None,
+        **adapter_options: Any,
+    ) -> AdapterResponse:
+        if files:
+            raise ProviderError(
+                "PerplexityAdapter does not support file attachments."
+            )
+        payload: dict[str, Any] = {
+            "model": self._resolve_model_target(model),
+            "messages": self._build_messages(prompt),
+        }
+        if output_format is not None:
+            payload["response_format"] = _cached_json_schema(output_format)
+        adapter_options.pop("latency_budget_ms", None)
+        adapter_options.pop("stream", None)
+        payload.update(adapter_options)
+        estimated = self._estimate_request_tokens(
+            len(str(prompt)), int(adapter_options.get("max_tokens", 1024))
+        )
+        async with self._sem:
+            await self._acquire_rate_slots(estimated)
+            response = await self.async_client.chat.completions.create(**payload)
+        return self._finish(response, return_citations)
+
+    def _finish(self, response: Any, return_citations: bool) -> AdapterResponse:
+        include_raw = self.provider_settings.get("include_raw", False)
+        if not (return_citations or include_raw):
+            # Plain-text path: read the content attribute directly and skip
+            # the full model_dump serialization walk.
+            try:
+                text = response.choices[0].message.content or ""
+            except (AttributeError, IndexError):
+                text = ""
+            return AdapterResponse(text=text, citations=[], raw={})
+        response_dict = (
+            response.model_dump(mode="json")
+            if hasattr(response, "model_dump")
+            else {}
+        )
+        text = ""
+        choices = response_dict.get("choices") or []
+        if choices:
+            text = (choices[0].get("message") or {}).get("content") or ""
+        citations = self._extract_citations(response_dict) if return_citations else []
+        raw = response_dict if include_raw else {}
+        return AdapterResponse(text=text, citations=citations, raw=raw)
@@ -0,0 +1,534 @@
+"""Public entry point: ``run_prompt`` routes a prompt to a provider adapter."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Sequence
+
+from pydantic import BaseModel
+
+from .adapters import get_adapter_class
+from .adapters.base import AdapterResponse, BaseAdapter, Citation
+from .cache import ExtractionCache, extraction_cache_key
+from .logger import PromptLogger
+from .ratelimit import provider_bucket
+from .settings import (
+    SettingsError,
+    canonical_provider_name,
+    get_provider_api_key,
+    load_settings,
+)
+
+_MODEL_PREFIX_PROVIDERS = (
+    ("gpt-", "openai"),
+    ("o1", "openai"),
+    ("o3", "openai"),
+    ("o4", "openai"),
+    ("claude", "anthropic"),
+    ("gemini", "gemini"),
+    ("grok", "grok"),
+    ("sonar", "perplexity"),
+)
+
+
+def resolve_provider_and_model(
+    settings: dict[str, Any], model: str | None
+) -> tuple[str, str]:
+    """Resolve a caller-supplied ``model`` into ``(provider, model_name)``.
+
+    ``model`` may be a provider name or alias (the provider's configured
+    default model is used), ``provider:model``, or a bare model name whose
+    family prefix identifies the provider.
+    """
+    providers = settings.get("providers", {})
+    if not model:
+        provider = settings.get("default_provider", "openai")
+        return provider, (providers.get(provider) or {}).get("model", "")
+    canonical = canonical_provider_name(model)
+    if canonical is not None:
+        configured = (providers.get(canonical) or {}).get("model")
+        if not configured:
+            raise SettingsError(f"No default model configured for {canonical!r}.")
+        return canonical, configured
+    if ":" in model:
+        provider_part, model_name = model.split(":", 1)
+        canonical = canonical_provider_name(provider_part)
+        if canonical is None:
+            raise SettingsError(f"Unknown provider: {provider_part!r}")
+        return canonical, model_name
+    lowered = model.strip().lower()
+    for prefix, provider in _MODEL_PREFIX_PROVIDERS:
+        if lowered.startswith(prefix):
+            return provider, model
+    raise SettingsError(f"Could not infer a provider for model {model!r}.")
+
+
+# One adapter per (provider, settings) for the process. The semaphore,
+# rate buckets, and upload cache live on the instance, so they only pace
+# or dedupe anything if repeated calls share that instance.
+_ADAPTER_INSTANCES: dict[tuple[str, str], BaseAdapter] = {}
+
+
+def get_adapter(provider: str, settings: dict[str, Any]) -> BaseAdapter:
+    """Return the shared adapter for ``provider``, validating its API key."""
+    try:
+        adapter_cls = get_adapter_class(provider)
+    except KeyError:
+        raise SettingsError(f"Unknown provider: {provider!r}") from None
+    api_key = get_provider_api_key(settings, provider)
+    if not api_key:
+        raise SettingsError(
+            f"No API key configured for provider {provider!r}; set it in "
+            "settings or the provider's environment variable."
+        )
+    provider_settings = dict(settings.get("providers", {}).get(provider) or {})
+    provider_settings["api_key"] = api_key
+    cache_dir = (settings.get("cache") or {}).get("dir")
+    if cache_dir:
+        # Lets adapters share the episode cache directory, e.g. for the
+        # content-addressed uploaded-file-id cache.
+        provider_settings.setdefault("cache_dir", cache_dir)
+    key = (provider, json.dumps(provider_settings, sort_keys=True, default=str))
+    adapter = _ADAPTER_INSTANCES.get(key)
+    if adapter is None:
+        adapter = _ADAPTER_INSTANCES[key] = adapter_cls(provider_settings)
+    return adapter
+
+
+def coerce_output(output_format: type[BaseModel], text: str) -> BaseModel:
+    """Validate the model's raw text into an ``output_format`` instance."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.strip("`")
+        if cleaned.startswith("json"):
+            cleaned = cleaned[4:]
+        cleaned = cleaned.strip()
+    # model_validate_json parses and validates in one pydantic-core pass,
+    # skipping the intermediate json.loads dict.
+    return output_format.model_validate_json(cleaned)
+
+
+def _append_extracted_files_to_prompt(
+    prompt: str | Sequence[Any], extracted: list[tuple[Path, str]]
+) -> str:
+    base = (
+        prompt
+        if isinstance(prompt, str)
+        else "\n\n".join(str(turn) for turn in prompt)
+    )
+    file_context = "\n\n".join(
+        f"[File: {path.name}]\n{text}" for path, text in extracted
+    )
+    return f"{base}\n\n{file_context}"
+
+
+def _build_log_args(
+    prompt: str | Sequence[Any],
+    provider: str,
+    model: str,
+    files: Any,
+) -> dict[str, Any]:
+    return {
+        "provider": provider,
+        "model": model,
+        "prompt": prompt if isinstance(prompt, str) else [str(t) for t in prompt],
+        "files": (
+            # (name, bytes) blob pairs log just the name.
+            [item[0] if isinstance(item, tuple) else str(item) for item in files]
+            if files
+            else None
+        ),
+    }
+
+
+def _episode_cache(settings: dict[str, Any]) -> ExtractionCache | None:
+    cache_dir = (settings.get("cache") or {}).get("dir")
+    return ExtractionCache(cache_dir) if cache_dir else None
+
+
+def _episode_cache_key(
+    provider: str,
+    model: str,
+    prompt: str | Sequence[Any],
+    file_blobs: list[tuple[str, bytes]],
+    adapter_options: dict[str, Any],
+    output_format: type[BaseModel] | None,
+    require_search: bool,
+    return_citations: bool,
+) -> str:
+    prompt_json = json.dumps(
+        prompt if isinstance(prompt, str) else [str(t) for t in prompt],
+        sort_keys=True,
+    )
+    # The resolved search/citations pair changes both the request and
+    # what gets stored, so a grounded run never aliases a plain one.
+    options_json = json.dumps(
+        {
+            **adapter_options,
+            "__require_search__": require_search,
+            "__return_citations__": return_citations,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    schema_json = (
+        json.dumps(output_format.model_json_schema(), sort_keys=True)
+        if output_format is not None
+        else ""
+    )
+    return extraction_cache_key(
+        provider, model, prompt_json, file_blobs, options_json, schema_json
+    )
+
+
+# Sentinel distinguishing "no cache entry" from a cached falsy result.
+_CACHE_MISS = object()
+
+
+def _feedback_prompt(
+    prompt: str | Sequence[Any], exc: Exception
+) -> list[Any]:
+    """Append a corrective turn after a structured-output validation failure."""
+    turns = [prompt] if isinstance(prompt, str) else list(prompt)
+    turns.append(
+        f"Your previous output failed validation: {exc}. "
+        "Fix the problem and retry with valid JSON only."
+    )
+    return turns
+
+
+def _prepare_episode(
+    prompt: str | Sequence[Any],
+    model: str | None,
+    output_format: type[BaseModel] | None,
+    require_search: bool,
+    return_citations: bool,
+    file_paths: Sequence[str | os.PathLike] | None,
+    settings_file: str | os.PathLike | None,
+    adapter_options: dict[str, Any],
+) -> dict[str, Any]:
+    """Shared setup for ``run_prompt``/``arun_prompt``.
+
+    Resolves the adapter, applies the search/citations coupling, folds
+    files into the prompt when needed, and probes the episode cache. The
+    returned episode dict carries everything the callers need, with
+    ``cached`` set to the final return value on a cache hit.
+    """
+    settings = load_settings(settings_file)
+    provider, resolved_model = resolve_provider_and_model(settings, model)
+    adapter = get_adapter(provider, settings)
+
+    if return_citations:
+        require_search = True
+    elif require_search:
+        return_citations = True
+
+    paths = [Path(p) for p in file_paths] if file_paths else []
+    file_blobs: list[tuple[str, bytes]] = []
+    files_arg: list[Path] | None = None
+    if paths:
+        file_blobs = [(p.name, p.read_bytes()) for p in paths]
+        if adapter.supports_binary_files:
+            # Adapters that take (name, bytes) pairs reuse the blobs read
+            # for cache hashing; the rest re-read by path at upload time.
+            files_arg = (
+                file_blobs
+                if getattr(adapter, "accepts_file_blobs", False)
+                else paths
+            )
+        else:
+            extracted = [
+                (p, blob.decode("utf-8", "replace"))
+                for p, (_, blob) in zip(paths, file_blobs)
+            ]
+            prompt = _append_extracted_files_to_prompt(prompt, extracted)
+
+    combined_options = dict(
+        (settings.get("providers", {}).get(provider) or {}).get("options") or {}
+    )
+    combined_options.update(adapter_options)
+
+    cache = _episode_cache(settings)
+    cache_key = None
+    cached: Any = _CACHE_MISS
+    if cache is not None:
+        cache_key = _episode_cache_key(
+            provider,
+            resolved_model,
+            prompt,
+            file_blobs,
+            combined_options,
+            output_format,
+            require_search,
+            return_citations,
+        )
+        payload = cache.get(cache_key)
+        if payload is not None:
+            try:
+                result: Any = (
+                    coerce_output(output_format, payload["text"])
+                    if output_format is not None
+                    else payload["text"]
+                )
+            except Exception:
+                # Stale schema or corrupt entry: evict and fall through.
+                cache.evict(cache_key)
+            else:
+                if return_citations:
+                    citations = [
+                        Citation.model_validate(c)
+                        for c in payload.get("citations", [])
+                    ]
+                    cached = (result, citations)
+                else:
+                    cached = result
+
+    return {
+        "settings": settings,
+        "provider": provider,
+        "bucket": provider_bucket(
+            provider, settings.get("providers", {}).get(provider)
+        ),
+        "model": resolved_model,
+        "adapter": adapter,
+        "prompt": prompt,
+        "output_format": output_format,
+        "require_search": require_search,
+        "return_citations": return_citations,
+        "files_arg": files_arg,
+        "combined_options": combined_options,
+        "cache": cache,
+        "cache_key": cache_key,
+        "cached": cached,
+    }
+
+
+def _finish_episode(episode: dict[str, Any], response: AdapterResponse) -> Any:
+    """Validate, persist, and shape the final return value of an episode."""
+    output_format = episode["output_format"]
+    result = (
+        coerce_output(output_format, response.text)
+        if output_format is not None
+        else response.text
+    )
+
+    cache = episode["cache"]
+    if cache is not None and episode["cache_key"] is not None:
+        cache.put(
+            episode["cache_key"],
+            {
+                "text": response.text,
+                "citations": [c.model_dump() for c in response.citations],
+                "raw": response.raw,
+                "ts": datetime.now(timezone.utc).isoformat(),
+                "schema": (
+                    output_format.model_json_schema()
+                    if output_format is not None
+                    else None
+                ),
+            },
+        )
+
+    if episode["return_citations"]:
+        return result, response.citations
+    return result
+
+
+def run_prompt(
+    prompt: str | Sequence[Any],
+    *,
+    model: str | None = None,
+    output_format: type[BaseModel] | None = None,
+    require_search: bool = False,
+    return_citations: bool = False,
+    file_paths: Sequence[str | os.PathLike] | None = None,
+    settings_file: str | os.PathLike | None = None,
+    latency_budget_ms: int | None = None,
+    max_output_retries: int = 2,
+    stream: bool = False,
+    **adapter_options: Any,
+) -> Any:
+    """Run ``prompt`` against the provider resolved from ``model``.
+
+    Returns the validated ``output_format`` instance (or the raw text when
+    no format is given); with ``return_citations`` the return value is a
+    ``(result, citations)`` tuple. Citations require web search, so either
+    flag implies the other. A loose ``latency_budget_ms`` (e.g. 600_000)
+    lets providers with a Batch API trade latency for the batch discount.
+    When structured output fails validation, the error is fed back to the
+    model and the call retried up to ``max_output_retries`` times.
+    With ``stream=True``, adapters that support it consume the provider's
+    streaming endpoint (cutting time-to-first-token) and validate the
+    accumulated text; the rest fall back to a regular call.
+    """
+    if latency_budget_ms is not None:
+        adapter_options["latency_budget_ms"] = latency_budget_ms
+    episode = _prepare_episode(
+        prompt,
+        model,
+        output_format,
+        require_search,
+        return_citations,
+        file_paths,
+        settings_file,
+        adapter_options,
+    )
+    if episode["cached"] is not _CACHE_MISS:
+        return episode["cached"]
+    if stream:
+        # Transport choice only; set after _prepare_episode so streamed
+        # and non-streamed runs share one cache key.
+        episode["combined_options"]["stream"] = True
+
+    logger = PromptLogger(episode["settings"].get("logging"))
+    event_id = logger.log_start(
+        _build_log_args(
+            episode["prompt"],
+            episode["provider"],
+            episode["model"],
+            episode["files_arg"],
+        ),
+        {},
+    )
+    started = time.monotonic()
+    current_prompt: Any = episode["prompt"]
+    bucket = episode["bucket"]
+    try:
+        for attempt in range(max_output_retries + 1):
+            if bucket is not None:
+                # The async path is paced by the adapters' own buckets;
+                # this blocking bucket spans threads calling run_prompt.
+                bucket.acquire()
+            response: AdapterResponse = episode["adapter"].run(
+                current_prompt,
+                model=episode["model"],
+                output_format=output_format,
+                require_search=episode["require_search"],
+                return_citations=episode["return_citations"],
+                files=episode["files_arg"],
+                **episode["combined_options"],
+            )
+            try:
+                result = _finish_episode(episode, response)
+            except ValueError as exc:
+                # pydantic.ValidationError and JSON decode errors both
+                # derive from ValueError; feed the error back and retry.
+                if output_format is None or attempt >= max_output_retries:
+                    raise
+                current_prompt = _feedback_prompt(episode["prompt"], exc)
+                time.sleep(1.0 * (attempt + 1))
+                continue
+            break
+    except Exception as exc:
+        logger.log_error(event_id, exc, time.monotonic() - started)
+        raise
+    logger.log_end(event_id, response.text, time.monotonic() - started)
+    return result
+
+
+async def arun_prompt(
+    prompt: str | Sequence[Any],
+    *,
+    model: str | None = None,
+    output_format: type[BaseModel] | None = None,
+    require_search: bool = False,
+    return_citations: bool = False,
+    file_paths: Sequence[str | os.PathLike] | None = None,
+    settings_file: str | os.PathLike | None = None,
+    latency_budget_ms: int | None = None,
+    max_output_retries: int = 2,
+    stream: bool = False,
+    **adapter_options: Any,
+) -> Any:
+    """Async counterpart of :func:`run_prompt` built on ``adapter.arun``.
+
+    Setup (settings, file reads, cache probe) stays synchronous; only the
+    provider round-trip is awaited, so many prompts can share the event
+    loop and the adapter's pooled async client.
+    """
+    if latency_budget_ms is not None:
+        adapter_options["latency_budget_ms"] = latency_budget_ms
+    episode = _prepare_episode(
+        prompt,
+        model,
+        output_format,
+        require_search,
+        return_citations,
+        file_paths,
+        settings_file,
+        adapter_options,
+    )
+    if episode["cached"] is not _CACHE_MISS:
+        return episode["cached"]
+    if stream:
+        # Transport choice only; set after _prepare_episode so streamed
+        # and non-streamed runs share one cache key.
+        episode["combined_options"]["stream"] = True
+
+    logger = PromptLogger(episode["settings"].get("logging"))
+    event_id = logger.log_start(
+        _build_log_args(
+            episode["prompt"],
+            episode["provider"],
+            episode["model"],
+            episode["files_arg"],
+        ),
+        {},
+    )
+    started = time.monotonic()
+    current_prompt: Any = episode["prompt"]
+    try:
+        for attempt in range(max_output_retries + 1):
+            response: AdapterResponse = await episode["adapter"].arun(
+                current_prompt,
+                model=episode["model"],
+                output_format=output_format,
+                require_search=episode["require_search"],
+                return_citations=episode["return_citations"],
+                files=episode["files_arg"],
+                **episode["combined_options"],
+            )
+            try:
+                result = _finish_episode(episode, response)
+            except ValueError as exc:
+                if output_format is None or attempt >= max_output_retries:
+                    raise
+                current_prompt = _feedback_prompt(episode["prompt"], exc)
+                await asyncio.sleep(1.0 * (attempt + 1))
+                continue
+            break
+    except Exception as exc:
+        logger.log_error(event_id, exc, time.monotonic() - started)
+        raise
+    logger.log_end(event_id, response.text, time.monotonic() - started)
+    return result
+
+
+def run_prompt_batch(
+    prompts: Sequence[str | Sequence[Any]],
+    *,
+    max_concurrency: int = 64,
+    **run_kwargs: Any,
+) -> list[Any]:
+    """Run many prompts concurrently, bounded by ``max_concurrency``.
+
+    Each prompt goes through :func:`arun_prompt` with the same keyword
+    arguments; results come back in input order. Must be called from
+    synchronous code (it owns the event loop).
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run_one(prompt: str | Sequence[Any]) -> Any:
+        async with semaphore:
+            return await arun_prompt(prompt, **run_kwargs)
+
+    async def _run_all() -> list[Any]:
+        return list(await asyncio.gather(*(_run_one(p) for p in prompts)))
+
+    return asyncio.run(_run_all())
+
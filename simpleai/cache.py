@@ -0,0 +1,102 @@
+"""On-disk extraction cache for ``run_prompt`` episodes.
+
+Keys are SHA-256 digests over length-prefixed request components, so the
+prompt, file bytes, options, and schema can never alias each other.
+Entries are one JSON file per key under the configured directory.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import struct
+import time
+from pathlib import Path
+from typing import Any
+
+_LENGTH_PREFIX = struct.Struct(">Q").pack
+
+# Provider-side uploads expire, so cached file ids do too.
+_FILE_ID_TTL_SECONDS = 24 * 60 * 60
+
+
+def extraction_cache_key(
+    provider: str,
+    model: str,
+    prompt_json: str,
+    file_blobs: list[tuple[str, bytes]],
+    options_json: str,
+    schema_json: str,
+) -> str:
+    """SHA-256 hex key over the length-prefixed request components."""
+    hasher = hashlib.sha256()
+    update = hasher.update
+
+    def feed(data: bytes) -> None:
+        update(_LENGTH_PREFIX(len(data)))
+        update(data)
+
+    feed(provider.encode())
+    feed(model.encode())
+    feed(prompt_json.encode())
+    for name, data in file_blobs:
+        feed(name.encode())
+        feed(data)
+    feed(options_json.encode())
+    feed(schema_json.encode())
+    return hasher.hexdigest()
+
+
+class ExtractionCache:
+    """One-JSON-file-per-key cache rooted at ``path``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key: str) -> Path:
+        return self.path / f"{key}.json"
+
+    def get(self, key: str) -> dict[str, Any] | None:
+        entry = self._entry_path(key)
+        try:
+            return json.loads(entry.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError):
+            # Unreadable entries are treated as misses and overwritten.
+            return None
+
+    def put(self, key: str, payload: dict[str, Any]) -> None:
+        entry = self._entry_path(key)
+        entry.write_text(json.dumps(payload, default=str), encoding="utf-8")
+
+    def evict(self, key: str) -> None:
+        self._entry_path(key).unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------
+    # Content-addressed provider file ids
+    # ------------------------------------------------------------------
+
+    def _file_id_path(self, sha: str) -> Path:
+        return self.path / f"file-id-{sha}.json"
+
+    def get_file_id(
+        self, sha: str, ttl_seconds: float = _FILE_ID_TTL_SECONDS
+    ) -> str | None:
+        """Provider file id for content hash ``sha``, or ``None`` if stale."""
+        try:
+            record = json.loads(
+                self._file_id_path(sha).read_text(encoding="utf-8")
+            )
+        except (OSError, ValueError):
+            return None
+        if time.time() - record.get("stored_at", 0.0) > ttl_seconds:
+            return None
+        return record.get("file_id")
+
+    def put_file_id(self, sha: str, file_id: str) -> None:
+        self._file_id_path(sha).write_text(
+            json.dumps({"file_id": file_id, "stored_at": time.time()}),
+            encoding="utf-8",
+        )
@@ -0,0 +1,154 @@
+"""Coalesce loose-latency-budget requests into provider Batch API jobs."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+from typing import Any
+
+from .adapters.base import ProviderError
+
+_TERMINAL_STATUSES = frozenset({"completed", "failed", "expired", "cancelled"})
+
+
+class FleetDispatcher:
+    """Pools queued Responses payloads into OpenAI Batch API jobs.
+
+    Submissions whose latency budget is at or below ``sync_max_latency_ms``
+    bypass batching and hit the synchronous endpoint. Looser submissions
+    are held for ``batch_window_ms`` once ``batch_min_size`` of them are
+    queued, then shipped as a single ``client.batches.create`` job, which
+    the provider bills at the batch discount. ``submit`` returns a future
+    that resolves to the per-request response body.
+    """
+
+    __slots__ = (
+        "adapter",
+        "sync_max_latency_ms",
+        "batch_window_ms",
+        "batch_min_size",
+        "_pending",
+        "_flusher",
+    )
+
+    def __init__(
+        self,
+        adapter: Any,
+        *,
+        sync_max_latency_ms: int = 30_000,
+        batch_window_ms: int = 2_000,
+        batch_min_size: int = 1,
+    ) -> None:
+        self.adapter = adapter
+        self.sync_max_latency_ms = sync_max_latency_ms
+        self.batch_window_ms = batch_window_ms
+        self.batch_min_size = batch_min_size
+        self._pending: list[tuple[dict[str, Any], asyncio.Future]] = []
+        self._flusher: asyncio.Task | None = None
+
+    async def submit(
+        self, *, latency_budget_ms: int, payload: dict[str, Any]
+    ) -> asyncio.Future:
+        """Queue ``payload`` and return a future for its response body."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        if latency_budget_ms <= self.sync_max_latency_ms:
+            try:
+                response = await self.adapter.async_client.responses.create(
+                    **payload
+                )
+            except Exception as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(response)
+            return future
+        self._pending.append((payload, future))
+        if len(self._pending) >= self.batch_min_size and (
+            self._flusher is None or self._flusher.done()
+        ):
+            self._flusher = loop.create_task(self._flush_after_window())
+        return future
+
+    async def _flush_after_window(self) -> None:
+        await asyncio.sleep(self.batch_window_ms / 1000.0)
+        pending, self._pending = self._pending, []
+        if pending:
+            await self._settle(pending)
+        # Requests queued while this flush polled the batch job get their
+        # own flusher; without this they would strand until an unrelated
+        # submit happened to arrive after the task finished.
+        if len(self._pending) >= self.batch_min_size:
+            self._flusher = asyncio.get_running_loop().create_task(
+                self._flush_after_window()
+            )
+
+    async def _settle(
+        self, pending: list[tuple[dict[str, Any], asyncio.Future]]
+    ) -> None:
+        try:
+            results = await self._run_batch([payload for payload, _ in pending])
+        except Exception as exc:
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        for index, (_, future) in enumerate(pending):
+            if future.done():
+                continue
+            outcome = results.get(f"req-{index}")
+            if outcome is None:
+                future.set_exception(
+                    ProviderError(f"Batch result missing for req-{index}.")
+                )
+            elif isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+    async def _run_batch(
+        self, payloads: list[dict[str, Any]]
+    ) -> dict[str, Any]:
+        client = self.adapter.async_client
+        lines = (
+            json.dumps(
+                {
+                    "custom_id": f"req-{index}",
+                    "method": "POST",
+                    "url": "/v1/responses",
+                    "body": payload,
+                }
+            )
+            for index, payload in enumerate(payloads)
+        )
+        blob = ("\n".join(lines) + "\n").encode("utf-8")
+        input_file = await client.files.create(
+            file=("batch_input.jsonl", blob), purpose="batch"
+        )
+        batch = await client.batches.create(
+            input_file_id=input_file.id,
+            endpoint="/v1/responses",
+            completion_window="24h",
+        )
+        delay = 1.0
+        while batch.status not in _TERMINAL_STATUSES:
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, 60.0)
+            batch = await client.batches.retrieve(batch.id)
+        if batch.status != "completed" or not batch.output_file_id:
+            raise ProviderError(
+                f"Batch job {batch.id} ended with status {batch.status!r}."
+            )
+        content = await client.files.content(batch.output_file_id)
+        text = content.text if hasattr(content, "text") else str(content)
+        results: dict[str, Any] = {}
+        for line in text.splitlines():
+            if not line:
+                continue
+            record = json.loads(line)
+            error = record.get("error")
+            results[record.get("custom_id")] = (
+                ProviderError(f"Batch request failed: {error}")
+                if error
+                else (record.get("response") or {}).get("body")
+            )
+        return results
@@ -0,0 +1,135 @@
+"""Structured JSON logging for prompt runs.
+
+Every ``run_prompt`` start/end/error pair is emitted as one JSON line to
+a dedicated log file, correlated by ``event_id``.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import queue
+import time
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any
+from uuid import uuid4
+
+try:  # pragma: no cover - exercised via the fallback branch
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _json_default(obj: Any) -> str:
+    # Path and other odd payload values; orjson handles datetime/UUID
+    # natively so this rarely fires.
+    return str(obj)
+
+
+class PromptLogger:
+    """Emits one JSON line per prompt-run event.
+
+    ``logging_settings`` is the ``logging`` section of the application
+    settings dict: ``enabled``, ``logfile``, and optionally
+    ``logger_name`` to reuse an already-configured logger (e.g. one the
+    host Django app owns) instead of attaching a file handler.
+    """
+
+    def __init__(self, logging_settings: dict[str, Any] | None = None) -> None:
+        self.settings = dict(logging_settings or {})
+        self.enabled = bool(self.settings.get("enabled", True))
+        self.max_preview_chars = int(self.settings.get("max_preview_chars", 5000))
+        self.logger = self._build_logger() if self.enabled else None
+
+    def _build_logger(self) -> logging.Logger:
+        name = self.settings.get("logger_name")
+        if name:
+            # Host-configured logger (e.g. Django LOGGING): use as-is.
+            return logging.getLogger(name)
+        logger = logging.getLogger("simpleai.prompts")
+        if not logger.handlers:
+            # Queue in front of the file handler: emit only enqueues, and a
+            # background listener does the blocking write. Keeps file I/O
+            # off the request path when many concurrent runs share the log.
+            file_handler = logging.FileHandler(
+                self.settings.get("logfile", "simpleai_prompts.log")
+            )
+            file_handler.setFormatter(logging.Formatter("%(message)s"))
+            record_queue: queue.SimpleQueue = queue.SimpleQueue()
+            listener = QueueListener(
+                record_queue, file_handler, respect_handler_level=True
+            )
+            listener.start()
+            atexit.register(listener.stop)
+            logger.addHandler(QueueHandler(record_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        return logger
+
+    def _emit(self, payload: dict[str, Any]) -> None:
+        if not self.enabled:
+            return
+        if orjson is not None:
+            line = orjson.dumps(payload, default=_json_default).decode()
+        else:
+            line = json.dumps(payload, default=str, separators=(",", ":"))
+        self.logger.info(line)
+
+    def new_event_id(self) -> str:
+        """Correlation id for callers that need one even when logging is off."""
+        return str(uuid4())
+
+    def log_start(
+        self, args: dict[str, Any], adapter_payload: dict[str, Any]
+    ) -> str:
+        # Fast path: with logging disabled, skip uuid4, time.time, and the
+        # payload dict entirely.
+        if not self.enabled:
+            return ""
+        event_id = str(uuid4())
+        self._emit(
+            {
+                "event": "run_prompt.start",
+                "event_id": event_id,
+                "timestamp": time.time(),
+                "args": args,
+                "adapter_payload": adapter_payload,
+            }
+        )
+        return event_id
+
+    def log_end(
+        self, event_id: str, result_text: str, duration_s: float
+    ) -> None:
+        if not self.enabled:
+            return
+        text = result_text or ""
+        limit = self.max_preview_chars
+        self._emit(
+            {
+                "event": "run_prompt.end",
+                "event_id": event_id,
+                "timestamp": time.time(),
+                "duration_s": duration_s,
+                # Slicing only when over budget avoids copying already-short
+                # results; long ones are cut before orjson re-encodes them.
+                "result_preview": text if len(text) <= limit else text[:limit],
+            }
+        )
+
+    def log_error(
+        self, event_id: str, error: BaseException, duration_s: float
+    ) -> None:
+        if not self.enabled:
+            return
+        self._emit(
+            {
+                "event": "run_prompt.error",
+                "event_id": event_id,
+                "timestamp": time.time(),
+                "duration_s": duration_s,
+                "error_type": type(error).__name__,
+                "error": str(error),
+            }
+        )
@@ -0,0 +1,371 @@
+"""Live smoke matrix: one file-grounded prompt against every provider.
+
+Run with real API keys configured; each provider extracts a structured
+job history from a sample resume with web-search citations required, so
+the matrix exercises file handling, structured output, and citations in
+one pass. Providers without keys are reported, not treated as failures.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable
+
+from pydantic import BaseModel
+
+from .adapters import get_adapter_class
+from .cache import ExtractionCache
+from .schema import output_model_schema
+from .settings import (
+    canonical_provider_name,
+    get_provider_api_key,
+    load_settings,
+)
+
+ANSI = {
+    "reset": "\x1b[0m",
+    "bold": "\x1b[1m",
+    "green": "\x1b[32m",
+    "red": "\x1b[31m",
+    "yellow": "\x1b[33m",
+}
+
+_ANSI_GET = ANSI.__getitem__
+
+
+# Bound lazily on first use (and patchable in tests) so importing this
+# module does not pull in the api/adapters stack.
+run_prompt = None
+
+
+def _ensure_run_prompt():
+    global run_prompt
+    if run_prompt is None:
+        from .api import run_prompt as _run_prompt
+
+        run_prompt = _run_prompt
+    return run_prompt
+
+
+def colorize(text: str, color: str) -> str:
+    return f"{_ANSI_GET(color)}{text}{ANSI['reset']}"
+
+
+# Status labels and rules recur on every line of the report; built once.
+_SUCCESS = colorize("SUCCESS", "green")
+_MISSING = colorize("API KEY NOT SET", "yellow")
+_FAILED = colorize("FAILED", "red")
+_EQ88 = "=" * 88
+_DASH88 = "-" * 88
+
+
+def emit(line: str = "") -> None:
+    print(line, flush=True)
+
+
+PROMPT = (
+    "Read the attached resume and extract the candidate's job history. "
+    "For each position, search the web to find the company's website and "
+    "include it as company_url. Return only the structured data."
+)
+
+
+class JobExperience(BaseModel):
+    company_name: str
+    role_title: str
+    start_date: str | None = None
+    end_date: str | None = None
+    company_url: str | None = None
+
+
+class JobHistory(BaseModel):
+    experiences: list[JobExperience]
+
+
+@dataclass(frozen=True)
+class ProviderTarget:
+    """One matrix row: display label, settings key, and run_prompt model."""
+
+    display_name: str
+    settings_provider: str
+    model_arg: str
+
+
+PROVIDER_TARGETS = [
+    ProviderTarget("OpenAI", "openai", "openai"),
+    ProviderTarget("Anthropic", "anthropic", "anthropic"),
+    ProviderTarget("Gemini", "gemini", "gemini"),
+    ProviderTarget("Grok", "grok", "grok"),
+    ProviderTarget("Perplexity", "perplexity", "perplexity"),
+]
+
+
+@dataclass
+class ProviderRunResult:
+    """Outcome of one provider run, with its buffered report lines."""
+
+    display_name: str
+    status: str  # "success" | "missing_key" | "failed"
+    detail: str = ""
+    lines: list[str] = field(default_factory=list)
+
+
+# Dev-loop response cache: repeated matrix runs with an unchanged model,
+# prompt, sample file, and schema skip the provider round-trip entirely.
+SMOKE_CACHE_DIR = Path.home() / ".cache" / "simpleai" / "smoke"
+
+
+def _sha256_file(file_path: Path) -> str:
+    with open(file_path, "rb") as handle:
+        if hasattr(hashlib, "file_digest"):  # 3.11+
+            return hashlib.file_digest(handle, "sha256").hexdigest()
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            digest.update(chunk)
+        return digest.hexdigest()
+
+
+def _smoke_cache_key(target: ProviderTarget, file_path: Path) -> str:
+    file_sha = _sha256_file(file_path)
+    schema_json = json.dumps(output_model_schema(JobHistory), sort_keys=True)
+    joined = "|".join((target.model_arg, PROMPT, file_sha, schema_json))
+    return hashlib.sha256(joined.encode()).hexdigest()
+
+
+_SAMPLE_FILENAMES = ("sample_resume.pdf", "resume.pdf", "sample.pdf")
+
+
+def _sample_candidates() -> Iterable[Path]:
+    for root in (Path.cwd(), Path(__file__).resolve().parent.parent):
+        for name in _SAMPLE_FILENAMES:
+            yield root / name
+            yield root / "samples" / name
+
+
+def resolve_sample_file_path(explicit: str | Path | None = None) -> Path:
+    """The sample file to attach: an explicit path or a discovered one."""
+    if explicit is not None:
+        path = Path(explicit).expanduser()
+        # is_file() alone covers existence in a single stat.
+        if not path.is_file():
+            raise FileNotFoundError(f"Sample file not found: {path}")
+        return path
+    # Lazy candidates: the generator stops statting after the first hit.
+    seen_paths: set[str] = set()
+    for candidate in _sample_candidates():
+        key = str(candidate)
+        if key in seen_paths:
+            continue
+        seen_paths.add(key)
+        if candidate.is_file():
+            return candidate
+    raise FileNotFoundError(
+        "No sample file found; pass file_path or add one of "
+        f"{', '.join(_SAMPLE_FILENAMES)} next to the project."
+    )
+
+
+def _file_handling_mode(target: ProviderTarget) -> str:
+    """How the provider receives the sample: binary upload or inline text."""
+    try:
+        adapter_cls = get_adapter_class(target.settings_provider)
+    except (KeyError, ImportError):
+        return "inline"
+    return "binary" if adapter_cls.supports_binary_files else "inline"
+
+
+def _provider_filter(only: Iterable[str] | None) -> set[str] | None:
+    """Canonical provider names to run, or ``None`` for all of them."""
+    if only is None:
+        return None
+    return {
+        canonical
+        for canonical in map(canonical_provider_name, only)
+        if canonical is not None
+    }
+
+
+async def _run_one(
+    target: ProviderTarget,
+    file_path: Path,
+    settings: dict[str, Any],
+    settings_file: str | Path | None,
+    api_key: str | None,
+    use_cache: bool,
+) -> ProviderRunResult:
+    lines = [_DASH88]
+    # Key check first: _file_handling_mode imports the provider SDK, which
+    # is wasted work (and wasted seconds) for providers with no key set.
+    if not api_key:
+        lines.append(colorize(target.display_name, "bold"))
+        lines.append(f"  {_MISSING}")
+        return ProviderRunResult(
+            target.display_name, "missing_key", "no API key", lines
+        )
+    mode = _file_handling_mode(target)
+    lines.append(
+        f"{colorize(target.display_name, 'bold')} ({mode} file handling)"
+    )
+    cache = ExtractionCache(SMOKE_CACHE_DIR) if use_cache else None
+    cache_key = (
+        _smoke_cache_key(target, file_path) if cache is not None else ""
+    )
+    cached = cache.get(cache_key) if cache is not None else None
+    if cached is not None:
+        history = JobHistory.model_validate_json(cached["history"])
+        citations = cached["citations"]
+    else:
+        max_retries = int(
+            (settings.get("providers", {}).get(target.settings_provider) or {})
+            .get("max_retries", 3)
+        )
+        for attempt in range(max_retries + 1):
+            try:
+                history, citations = await asyncio.to_thread(
+                    _ensure_run_prompt(),
+                    PROMPT,
+                    model=target.model_arg,
+                    output_format=JobHistory,
+                    return_citations=True,
+                    file_paths=[file_path],
+                    settings_file=settings_file,
+                )
+                break
+            except Exception as exc:
+                if attempt >= max_retries:
+                    lines.append(f"  {_FAILED}  {exc}")
+                    return ProviderRunResult(
+                        target.display_name, "failed", str(exc), lines
+                    )
+                # Exponential backoff with jitter: one transient 429 or
+                # timeout should not poison a multi-minute matrix run.
+                delay = min(30.0, (2**attempt) + random.uniform(0, 1))
+                lines.append(
+                    "  "
+                    + colorize(
+                        f"retry {attempt + 1}/{max_retries} in {delay:.1f}s",
+                        "yellow",
+                    )
+                )
+                await asyncio.sleep(delay)
+        if cache is not None and citations:
+            cache.put(
+                cache_key,
+                {
+                    # Stored as a JSON string so rehydration is a single
+                    # model_validate_json call, no intermediate dicts.
+                    "history": history.model_dump_json(),
+                    "citations": [
+                        citation.model_dump() for citation in citations
+                    ],
+                },
+            )
+    if not citations:
+        detail = "no citations returned"
+        lines.append(f"  {_FAILED}  {detail}")
+        return ProviderRunResult(target.display_name, "failed", detail, lines)
+    detail = (
+        f"{len(history.experiences)} experiences, {len(citations)} citations"
+    )
+    if cached is not None:
+        detail += " (cached)"
+    lines.append(f"  {_SUCCESS}  {detail}")
+    for experience in history.experiences:
+        lines.append(
+            f"    {experience.role_title} @ {experience.company_name}"
+            f" ({experience.start_date} - {experience.end_date})"
+        )
+    return ProviderRunResult(target.display_name, "success", detail, lines)
+
+
+async def _run_matrix(
+    targets: list[ProviderTarget],
+    file_path: Path,
+    settings: dict[str, Any],
+    settings_file: str | Path | None,
+    use_cache: bool,
+) -> dict[str, ProviderRunResult]:
+    # One settings/env lookup per provider, shared by every task.
+    api_keys = {
+        provider: get_provider_api_key(settings, provider)
+        for provider in {target.settings_provider for target in targets}
+    }
+    tasks = [
+        _run_one(
+            target,
+            file_path,
+            settings,
+            settings_file,
+            api_keys[target.settings_provider],
+            use_cache,
+        )
+        for target in targets
+    ]
+    completed = await asyncio.gather(*tasks, return_exceptions=True)
+    results: dict[str, ProviderRunResult] = {}
+    for target, outcome in zip(targets, completed):
+        if isinstance(outcome, BaseException):
+            outcome = ProviderRunResult(
+                target.display_name,
+                "failed",
+                str(outcome),
+                [f"  {_FAILED}  {outcome}"],
+            )
+        results[outcome.display_name] = outcome
+    return results
+
+
+def run_provider_matrix(
+    file_path: str | Path | None = None,
+    settings_file: str | Path | None = None,
+    only: Iterable[str] | None = None,
+    use_cache: bool = True,
+) -> dict[str, str]:
+    """Run every eligible provider concurrently; return name -> status.
+
+    Providers dispatch together via ``asyncio.gather`` (each ``run_prompt``
+    runs in a thread), so wall time is the slowest provider rather than
+    the sum. Each provider's report lines are buffered and flushed in
+    fixed target order, keeping the output deterministic.
+
+    Successful runs are cached on disk under ``SMOKE_CACHE_DIR``, keyed
+    by model, prompt, sample-file hash, and schema, so repeat runs with
+    unchanged inputs skip the provider round-trip; pass
+    ``use_cache=False`` to force live calls.
+    """
+    settings = load_settings(settings_file)
+    sample = resolve_sample_file_path(file_path)
+    selected = _provider_filter(only)
+    targets = [
+        target
+        for target in PROVIDER_TARGETS
+        if selected is None or target.settings_provider in selected
+    ]
+
+    emit(_EQ88)
+    emit(colorize(f"simpleai provider matrix - {sample.name}", "bold"))
+    emit(_EQ88)
+
+    results = asyncio.run(
+        _run_matrix(targets, sample, settings, settings_file, use_cache)
+    )
+
+    summary: dict[str, str] = {}
+    for target in targets:
+        result = results[target.display_name]
+        for line in result.lines:
+            emit(line)
+        summary[target.display_name] = result.status
+    emit(_EQ88)
+    succeeded = sum(1 for status in summary.values() if status == "success")
+    emit(f"{succeeded}/{len(summary)} providers succeeded.")
+    return summary
+
+
+if __name__ == "__main__":  # pragma: no cover - manual smoke entry point
+    run_provider_matrix()
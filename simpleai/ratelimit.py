@@ -0,0 +1,73 @@
+"""Process-wide, thread-safe rate limiting for the synchronous prompt path.
+
+The adapters' asyncio buckets only pace calls sharing one event loop;
+``run_prompt`` is frequently driven from many plain threads, so this
+module keeps one blocking :class:`TokenBucket` per provider, built from
+``settings["providers"][<provider>]["rate_limit"]``.
+"""
+
+from __future__ import annotations
+
+import threading
+from time import monotonic
+from typing import Any
+
+
+class TokenBucket:
+    """Blocking token bucket refilled continuously at ``rate_per_sec``.
+
+    ``acquire`` sleeps on a :class:`threading.Condition` until the
+    requested tokens accrue, so concurrent threads self-throttle below
+    the provider ceiling instead of burning round-trips on 429 retries.
+    """
+
+    __slots__ = ("rate_per_sec", "capacity", "_tokens", "_updated", "_cond")
+
+    def __init__(self, rate_per_sec: float, capacity: float | None = None) -> None:
+        self.rate_per_sec = float(rate_per_sec)
+        self.capacity = float(capacity if capacity is not None else rate_per_sec)
+        self._tokens = self.capacity
+        self._updated = monotonic()
+        self._cond = threading.Condition()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated) * self.rate_per_sec,
+        )
+        self._updated = now
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        tokens = min(float(tokens), self.capacity)
+        with self._cond:
+            while True:
+                self._refill()
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return
+                self._cond.wait((tokens - self._tokens) / self.rate_per_sec)
+
+
+_BUCKETS: dict[str, TokenBucket] = {}
+_BUCKETS_LOCK = threading.Lock()
+
+
+def provider_bucket(
+    provider: str, provider_settings: dict[str, Any] | None
+) -> TokenBucket | None:
+    """Shared bucket for ``provider``, or ``None`` when unconfigured.
+
+    ``rate_limit`` takes ``requests_per_second`` and optional ``burst``
+    (the bucket capacity, defaulting to one second's worth of requests).
+    """
+    rate_limit = (provider_settings or {}).get("rate_limit") or {}
+    rate = rate_limit.get("requests_per_second")
+    if not rate:
+        return None
+    with _BUCKETS_LOCK:
+        bucket = _BUCKETS.get(provider)
+        if bucket is None:
+            bucket = TokenBucket(float(rate), rate_limit.get("burst"))
+            _BUCKETS[provider] = bucket
+    return bucket
@@ -0,0 +1,105 @@
+"""Provider-specific JSON Schema shaping for structured output.
+
+Each provider accepts a slightly different dialect: OpenAI requires
+closed objects with ``strict`` mode, Anthropic rejects some array
+keywords, Perplexity wraps the schema in a ``json_schema`` envelope.
+
+All four public entry points are memoized per model class and return a
+shared dict: callers must treat the result as immutable (every in-repo
+caller either embeds it in a payload or copies before mutating).
+"""
+
+from __future__ import annotations
+
+import json
+from functools import lru_cache
+from typing import Any
+
+from pydantic import BaseModel
+
+UNSUPPORTED_ARRAY_KEYWORDS = ("minItems", "maxItems", "uniqueItems")
+
+# Keys whose presence marks a node as an object schema even without
+# an explicit "type": "object".
+_OBJECTISH_KEYS = frozenset(
+    {"properties", "required", "patternProperties", "additionalProperties"}
+)
+
+
+def _clone(schema: dict[str, Any]) -> dict[str, Any]:
+    # JSON round-trip: schemas are plain JSON data, and dumps/loads beats
+    # deepcopy's generic recursive dispatch by a wide margin.
+    return json.loads(json.dumps(schema))
+
+
+@lru_cache(maxsize=128)
+def output_model_schema(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """The plain JSON Schema for ``model_cls``."""
+    return _clone(model_cls.model_json_schema())
+
+
+def enforce_closed_objects(schema: dict[str, Any]) -> dict[str, Any]:
+    """A copy of ``schema`` with ``additionalProperties: false`` everywhere.
+
+    OpenAI strict mode requires every object node to be closed.
+    """
+    normalized = _clone(schema)
+    # Iterative walk: no recursion-depth ceiling and no per-node Python
+    # frame, which matters for deeply nested generated schemas.
+    stack: list[Any] = [normalized]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get("type") == "object" or not _OBJECTISH_KEYS.isdisjoint(
+                node
+            ):
+                node["additionalProperties"] = False
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return normalized
+
+
+def strip_schema_keywords(
+    schema: dict[str, Any], keywords: tuple[str, ...] = UNSUPPORTED_ARRAY_KEYWORDS
+) -> dict[str, Any]:
+    """A copy of ``schema`` with the given keywords removed from every node."""
+    normalized = _clone(schema)
+    stack: list[Any] = [normalized]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            for keyword in keywords:
+                node.pop(keyword, None)
+            stack.extend(node.values())
+        elif isinstance(node, list):
+            stack.extend(node)
+    return normalized
+
+
+@lru_cache(maxsize=128)
+def openai_response_schema(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """The ``text.format`` entry for OpenAI's Responses structured output."""
+    return {
+        "type": "json_schema",
+        "name": model_cls.__name__,
+        "schema": enforce_closed_objects(output_model_schema(model_cls)),
+        "strict": True,
+    }
+
+
+@lru_cache(maxsize=128)
+def anthropic_response_schema(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """An input schema acceptable to Anthropic's tool interface."""
+    return strip_schema_keywords(
+        enforce_closed_objects(output_model_schema(model_cls))
+    )
+
+
+@lru_cache(maxsize=128)
+def perplexity_response_schema(model_cls: type[BaseModel]) -> dict[str, Any]:
+    """The ``response_format`` envelope for Perplexity structured output."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"schema": output_model_schema(model_cls)},
+    }
@@ -0,0 +1,210 @@
+"""Application settings: defaults, discovery, merging, and provider keys.
+
+Settings are a plain nested dict. ``load_settings`` starts from
+``DEFAULT_SETTINGS``, finds the application's ``ai_settings.json`` (or an
+explicit path), and deep-merges user values over the defaults.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+from copy import deepcopy
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+SETTINGS_FILENAME = "ai_settings.json"
+
+
+class SettingsError(RuntimeError):
+    """Raised when settings are missing, malformed, or incomplete."""
+
+
+DEFAULT_SETTINGS: dict[str, Any] = {
+    "default_provider": "openai",
+    "providers": {
+        "openai": {"model": "gpt-5", "max_retries": 3},
+        "anthropic": {"model": "claude-sonnet-4-5", "max_retries": 3},
+        "gemini": {"model": "gemini-2.5-pro"},
+        "grok": {"model": "grok-4"},
+        "perplexity": {"model": "sonar-pro"},
+    },
+    "logging": {"enabled": False},
+    "cache": {},
+}
+
+_PROVIDER_ALIASES = {
+    "openai": "openai",
+    "gpt": "openai",
+    "anthropic": "anthropic",
+    "claude": "anthropic",
+    "gemini": "gemini",
+    "google": "gemini",
+    "grok": "grok",
+    "xai": "grok",
+    "perplexity": "perplexity",
+    "sonar": "perplexity",
+}
+
+PROVIDER_ENV_VARS: dict[str, tuple[str, ...]] = {
+    "openai": ("OPENAI_API_KEY",),
+    "anthropic": ("ANTHROPIC_API_KEY",),
+    "gemini": ("GEMINI_API_KEY", "GOOGLE_API_KEY"),
+    "grok": ("XAI_API_KEY", "GROK_API_KEY"),
+    "perplexity": ("PERPLEXITY_API_KEY",),
+}
+
+
+# Bound method lookup hoisted out of the per-call path; the alias table
+# is fixed at import time.
+_CANONICAL = _PROVIDER_ALIASES.get
+
+
+@lru_cache(maxsize=64)
+def canonical_provider_name(name: str | None) -> str | None:
+    """Map a provider name or alias to its canonical form, or ``None``."""
+    if not name:
+        return None
+    return _CANONICAL(name.strip().lower())
+
+
+def expected_provider_env_vars(provider: str) -> tuple[str, ...]:
+    """Environment variables consulted for ``provider``'s API key."""
+    return PROVIDER_ENV_VARS.get(provider, ())
+
+
+def get_provider_api_key(settings: dict[str, Any], provider: str) -> str | None:
+    """The provider's API key from settings, falling back to environment."""
+    configured = (settings.get("providers", {}).get(provider) or {}).get("api_key")
+    if configured:
+        return configured
+    for var in expected_provider_env_vars(provider):
+        value = os.getenv(var)
+        if value:
+            return value
+    return None
+
+
+def get_http_client(settings: dict[str, Any] | None = None) -> Any:
+    """Shared pooled HTTP client for provider calls.
+
+    Delegates to the adapters' process-wide ``httpx.Client`` (keep-alive
+    pooling, HTTP/2 when available), so settings-driven callers and the
+    SDK adapters reuse the same warm connections. ``settings`` is accepted
+    for symmetry with the other accessors; the client is process-global.
+    """
+    from .adapters.base import shared_http_client
+
+    return shared_http_client()
+
+
+def get_async_http_client(settings: dict[str, Any] | None = None) -> Any:
+    """Async twin of :func:`get_http_client`."""
+    from .adapters.base import shared_async_http_client
+
+    return shared_async_http_client()
+
+
+# Roots rarely change within a process; cache per working directory so a
+# chdir still picks up the new location.
+_ROOTS_CACHE: dict[str, list[Path]] = {}
+
+
+def _application_roots() -> list[Path]:
+    cwd = Path.cwd()
+    cached = _ROOTS_CACHE.get(str(cwd))
+    if cached is not None:
+        return cached
+    roots = [cwd]
+    main = sys.modules.get("__main__")
+    main_file = getattr(main, "__file__", None)
+    if main_file:
+        roots.append(Path(main_file).resolve().parent)
+    _ROOTS_CACHE[str(cwd)] = roots
+    return roots
+
+
+def _deep_merge(base: dict[str, Any], override: dict[str, Any]) -> dict[str, Any]:
+    """Merge ``override`` over ``base``, copying only the diverging paths.
+
+    Untouched subtrees are shared with ``base`` by reference; callers
+    (``load_settings``) deep-copy the result before handing it out, so
+    the merge itself can skip the full-tree deepcopy.
+    """
+    merged = dict(base)
+    for key, value in override.items():
+        current = merged.get(key)
+        if isinstance(value, dict) and isinstance(current, dict):
+            merged[key] = _deep_merge(current, value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def _normalize_user_settings(user: dict[str, Any]) -> dict[str, Any]:
+    """Canonicalize provider keys in a user settings dict."""
+    providers = user.get("providers")
+    if not isinstance(providers, dict):
+        return user
+    normalized = {
+        canonical_provider_name(name) or name.strip().lower(): value
+        for name, value in providers.items()
+    }
+    out = dict(user)
+    out["providers"] = normalized
+    return out
+
+
+def _find_settings_file() -> Path | None:
+    for root in _application_roots():
+        candidate = root / SETTINGS_FILENAME
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+# Parsed settings keyed by (path, st_mtime_ns); stale keys are pruned on
+# refresh so edits to the file invalidate naturally.
+_SETTINGS_CACHE: dict[tuple[str, int], dict[str, Any]] = {}
+
+
+def load_settings(settings_file: str | os.PathLike | None = None) -> dict[str, Any]:
+    """Load settings, merging the user's ``ai_settings.json`` over defaults.
+
+    ``settings_file`` overrides discovery; a missing explicit file is an
+    error, while absent discovered settings simply yield the defaults.
+    Parsed files are cached against their mtime, so steady-state callers
+    skip the disk read and JSON parse entirely.
+    """
+    if settings_file is not None:
+        path: Path | None = Path(settings_file).expanduser()
+        if not path.is_file():
+            raise SettingsError(f"Settings file not found: {path}")
+    else:
+        path = _find_settings_file()
+    if path is None:
+        # No user file: a straight copy of the defaults, no merge needed.
+        return deepcopy(DEFAULT_SETTINGS)
+    try:
+        stat = os.stat(path)
+    except OSError as exc:
+        raise SettingsError(f"Could not read settings from {path}: {exc}") from exc
+    cache_key = (str(path), stat.st_mtime_ns)
+    cached = _SETTINGS_CACHE.get(cache_key)
+    if cached is not None:
+        # Deep copy so caller mutation cannot poison the cache.
+        return deepcopy(cached)
+    try:
+        user = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        raise SettingsError(f"Could not read settings from {path}: {exc}") from exc
+    if not isinstance(user, dict):
+        raise SettingsError(f"Settings root must be a JSON object: {path}")
+    merged = _deep_merge(DEFAULT_SETTINGS, _normalize_user_settings(user))
+    stale = [key for key in _SETTINGS_CACHE if key[0] == cache_key[0]]
+    for key in stale:
+        del _SETTINGS_CACHE[key]
+    _SETTINGS_CACHE[cache_key] = merged
+    return deepcopy(merged)
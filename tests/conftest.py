@@ -0,0 +1,19 @@
+"""Shared fixtures for the test suite."""
+
+import pytest
+
+
+@pytest.fixture(scope="session")
+def hello_text(tmp_path_factory):
+    """A canonical "hello" text file; tests hardlink it into place."""
+    path = tmp_path_factory.mktemp("shared") / "hello.txt"
+    path.write_text("hello", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="session")
+def sample_pdf(tmp_path_factory):
+    """A minimal PDF-shaped sample file, written once per session."""
+    path = tmp_path_factory.mktemp("smoke") / "resume.pdf"
+    path.write_bytes(b"%PDF-1.4\n")
+    return path
@@ -0,0 +1,479 @@
+"""Adapter payload construction and citation extraction against fake clients."""
+
+import os
+import shutil
+from dataclasses import dataclass
+from types import SimpleNamespace
+
+import pytest
+
+from simpleai.adapters.anthropic_adapter import AnthropicAdapter
+from simpleai.adapters.gemini_adapter import GeminiAdapter
+from simpleai.adapters.grok_adapter import GrokAdapter
+from simpleai.adapters.openai_adapter import OpenAIAdapter
+from simpleai.adapters.perplexity_adapter import PerplexityAdapter
+
+
+# Module-scoped adapters: construction (settings parsing, client
+# scaffolding) is paid once; each test installs its own fake .client.
+@pytest.fixture(scope="module")
+def anthropic_adapter():
+    return AnthropicAdapter({"api_key": "test", "max_tokens": 100})
+
+
+@pytest.fixture(scope="module")
+def gemini_adapter():
+    return GeminiAdapter({"api_key": "test"})
+
+
+@pytest.fixture(scope="module")
+def grok_adapter():
+    return GrokAdapter({"api_key": "test"})
+
+
+@pytest.fixture(scope="module")
+def openai_adapter():
+    return OpenAIAdapter({"api_key": "test"})
+
+
+@pytest.fixture(scope="module")
+def perplexity_adapter():
+    return PerplexityAdapter({"api_key": "test"})
+
+
+@pytest.fixture(scope="module")
+def client_ns():
+    """One reusable namespace for fake clients; tests assign onto it."""
+    return SimpleNamespace()
+
+
+# ---------------------------------------------------------------------------
+# Shared fakes: class bodies execute once at import instead of per test.
+# ---------------------------------------------------------------------------
+
+
+# Slotted leaves: no per-instance __dict__ for the many tiny objects the
+# fakes hand back.
+@dataclass(slots=True)
+class FakeUploadedFile:
+    name: str
+
+
+@dataclass(slots=True)
+class FakeFileRecord:
+    id: str
+
+
+@dataclass(slots=True)
+class FakeWebCitation:
+    url: str
+
+
+@dataclass(slots=True)
+class FakeInlineCitation:
+    web_citation: FakeWebCitation
+
+
+class _FakeCreateEndpoint:
+    """Records ``create(**kwargs)`` and returns a canned response.
+
+    Stands in for ``responses``, ``messages``, and ``chat.completions``.
+    """
+
+    def __init__(self, response):
+        self._response = response
+        self.payload = None
+
+    def create(self, **kwargs):
+        self.payload = kwargs
+        return self._response
+
+
+class _FakeUploadFiles:
+    """Records path-based ``upload(file=...)`` calls (Gemini/Grok style)."""
+
+    def __init__(self):
+        self.uploaded = []
+
+    def upload(self, file):
+        self.uploaded.append(file)
+        return FakeUploadedFile(file)
+
+
+class _FakeOpenAIFiles:
+    """Records blob-based ``create(file=..., purpose=...)`` calls.
+
+    Zero-copy on purpose: reading the handle here would traverse the
+    upload twice; the test asserts non-empty content before the run.
+    """
+
+    def __init__(self):
+        self.calls = []
+
+    def create(self, file, purpose):
+        self.calls.append((purpose, True))
+        return FakeFileRecord(id="file-1")
+
+
+class _FakeModels:
+    """Records ``generate_content(**kwargs)`` (Gemini style)."""
+
+    def __init__(self, response):
+        self._response = response
+        self.request = None
+
+    def generate_content(self, **kwargs):
+        self.request = kwargs
+        return self._response
+
+
+class _FakeChat:
+    def __init__(self, response):
+        self._response = response
+        self.messages = []
+
+    def append(self, message):
+        self.messages.append(message)
+
+    def sample(self):
+        return self._response
+
+
+class _FakeChatFactory:
+    """Records ``chat.create(**kwargs)`` and hands out one chat (Grok)."""
+
+    def __init__(self, response):
+        self.kwargs = None
+        self.chat = _FakeChat(response)
+
+    def create(self, **kwargs):
+        self.kwargs = kwargs
+        return self.chat
+
+
+class FakeAnthropicResponse:
+    def __init__(self):
+        self.content = self.model_dump()["content"]
+
+    def model_dump(self, mode="json"):
+        return {
+            "content": [
+                {
+                    "type": "text",
+                    "text": "Hello from Claude",
+                    "citations": [
+                        {
+                            "url": "https://example.com",
+                            "title": "Example",
+                            "cited_text": "hello",
+                            "start_index": 0,
+                            "end_index": 5,
+                        }
+                    ],
+                },
+                {
+                    "type": "web_search_tool_result",
+                    "content": [
+                        {
+                            "url": "https://source.example",
+                            "title": "Source",
+                            "page_age": "1 day",
+                        }
+                    ],
+                },
+            ]
+        }
+
+
+class FakeGeminiResponse:
+    text = "Gemini says hi"
+
+    def model_dump(self, mode="json"):
+        return {
+            "candidates": [
+                {
+                    "content": {"parts": [{"text": "Gemini says hi"}]},
+                    "grounding_metadata": {
+                        "grounding_chunks": [
+                            {
+                                "web": {
+                                    "uri": "https://gemini.example",
+                                    "title": "Gemini Source",
+                                }
+                            }
+                        ]
+                    },
+                }
+            ]
+        }
+
+
+class FakeGrokResponse:
+    content = "Grok answer"
+    citations = ["https://cite.example"]
+    inline_citations = [
+        FakeInlineCitation(FakeWebCitation("https://grok.example"))
+    ]
+    proto = None
+
+
+# Built once at import and returned by reference: the adapter only reads
+# the dump, so per-call reconstruction of the nested literal is waste.
+_OPENAI_FAKE_DUMP = {
+    "output": [
+        {
+            "type": "message",
+            "content": [
+                {
+                    "type": "output_text",
+                    "text": "Hello from OpenAI",
+                    "annotations": [
+                        {
+                            "type": "url_citation",
+                            "url": "https://example.com",
+                            "title": "Example",
+                            "start_index": 0,
+                            "end_index": 5,
+                        }
+                    ],
+                }
+            ],
+        },
+        {
+            "type": "web_search_call",
+            "action": {"sources": ["https://source.example"]},
+        },
+    ]
+}
+
+
+class FakeOpenAIResponse:
+    output_text = "Hello from OpenAI"
+
+    def model_dump(self, mode="json"):
+        return _OPENAI_FAKE_DUMP
+
+
+class FakePerplexityResponse:
+    def model_dump(self, mode="json"):
+        return {
+            "choices": [{"message": {"content": "Perplexity answer"}}],
+            "search_results": [
+                {"url": "https://pplx.example", "title": "Source"}
+            ],
+            "citations": ["https://cite.example"],
+        }
+
+
+def _place_upload(source, destination):
+    """Hardlink the shared sample into place (copy where links fail)."""
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copy(source, destination)
+    return destination
+
+
+def _make_anthropic(adapter, tmp_path, hello_text, client_ns):
+    fake_messages = _FakeCreateEndpoint(FakeAnthropicResponse())
+    client_ns.messages = fake_messages
+    adapter.client = client_ns
+
+    def check(response):
+        assert fake_messages.payload["model"] == "claude-test"
+        assert fake_messages.payload["max_tokens"] == 100
+        assert fake_messages.payload["messages"] == [
+            {"role": "user", "content": [{"type": "text", "text": "hi there"}]}
+        ]
+
+    return (
+        {"prompt": "hi there", "model": "claude-test"},
+        "Hello from Claude",
+        {"https://example.com", "https://source.example"},
+        check,
+    )
+
+
+def _make_gemini(adapter, tmp_path, hello_text, client_ns):
+    upload_file = _place_upload(hello_text, tmp_path / "data.txt")
+    fake_models = _FakeModels(FakeGeminiResponse())
+    fake_files = _FakeUploadFiles()
+    client_ns.models = fake_models
+    client_ns.files = fake_files
+    adapter.client = client_ns
+
+    def check(response):
+        assert {c.url for c in response.citations} == {"https://gemini.example"}
+        assert fake_files.uploaded == [str(upload_file)]
+        assert fake_models.request["model"] == "gemini-test"
+        assert fake_models.request["contents"][-1] == "describe the file"
+
+    return (
+        {
+            "prompt": "describe the file",
+            "model": "gemini-test",
+            "files": [upload_file],
+        },
+        "Gemini says hi",
+        {"https://gemini.example"},
+        check,
+    )
+
+
+def _make_grok(adapter, tmp_path, hello_text, client_ns):
+    upload_file = _place_upload(hello_text, tmp_path / "note.txt")
+    fake_chat_factory = _FakeChatFactory(FakeGrokResponse())
+    fake_files = _FakeUploadFiles()
+    client_ns.chat = fake_chat_factory
+    client_ns.files = fake_files
+    adapter.client = client_ns
+    adapter.chat_helpers = SimpleNamespace(user=lambda *contents: contents)
+
+    def check(response):
+        assert fake_chat_factory.kwargs["model"] == "grok-test"
+        assert fake_files.uploaded == [str(upload_file)]
+        last_message = fake_chat_factory.chat.messages[-1]
+        assert last_message[0] == "hello grok"
+        assert last_message[1].name == str(upload_file)
+
+    return (
+        {
+            "prompt": "hello grok",
+            "model": "grok-test",
+            "files": [upload_file],
+        },
+        "Grok answer",
+        {"https://cite.example", "https://grok.example"},
+        check,
+    )
+
+
+def _make_openai(adapter, tmp_path, hello_text, client_ns):
+    upload_file = _place_upload(hello_text, tmp_path / "report.txt")
+    assert upload_file.stat().st_size > 0
+    fake_responses = _FakeCreateEndpoint(FakeOpenAIResponse())
+    fake_files = _FakeOpenAIFiles()
+    client_ns.files = fake_files
+    client_ns.responses = fake_responses
+    adapter.client = client_ns
+
+    def check(response):
+        assert fake_files.calls == [("user_data", True)]
+        assert fake_responses.payload["model"] == "gpt-test"
+        first_content = fake_responses.payload["input"][0]["content"]
+        assert first_content[0] == {"type": "input_text", "text": "summarize"}
+        assert first_content[1] == {"type": "input_file", "file_id": "file-1"}
+
+    return (
+        {
+            "prompt": "summarize",
+            "model": "gpt-test",
+            "files": [upload_file],
+        },
+        "Hello from OpenAI",
+        {"https://example.com", "https://source.example"},
+        check,
+    )
+
+
+def _make_perplexity(adapter, tmp_path, hello_text, client_ns):
+    fake_completions = _FakeCreateEndpoint(FakePerplexityResponse())
+    client_ns.chat = SimpleNamespace(completions=fake_completions)
+    adapter.client = client_ns
+
+    def check(response):
+        assert fake_completions.payload["model"] == "sonar-pro"
+        assert fake_completions.payload["messages"] == [
+            {"role": "user", "content": "ask something"}
+        ]
+
+    return (
+        {"prompt": "ask something", "model": "gpt-4o"},
+        "Perplexity answer",
+        {"https://pplx.example", "https://cite.example"},
+        check,
+    )
+
+
+# One shared body: (adapter fixture, fake factory) per provider. The
+# factory wires fakes onto the adapter and returns run kwargs, expected
+# text/URLs, and a closure holding the provider-specific payload asserts.
+PROVIDERS = [
+    ("anthropic_adapter", _make_anthropic),
+    ("gemini_adapter", _make_gemini),
+    ("grok_adapter", _make_grok),
+    ("openai_adapter", _make_openai),
+    ("perplexity_adapter", _make_perplexity),
+]
+
+
+def test_response_cache_key_discriminates_files_and_search():
+    from simpleai.adapters._cache import response_cache_key
+
+    base = dict(
+        provider="gemini",
+        model="gemini-test",
+        prompt="q",
+        adapter_options={},
+        output_format=None,
+    )
+
+    plain = response_cache_key(**base)
+    searched = response_cache_key(
+        **base, require_search=True, return_citations=True
+    )
+    with_file = response_cache_key(
+        **base, files_fingerprint=(("a.txt", "digest"),)
+    )
+
+    assert len({plain, searched, with_file}) == 3
+
+
+def test_grok_proto_raw_defers_and_round_trips(monkeypatch):
+    from google.protobuf import json_format
+
+    converted = []
+
+    def fake_message_to_dict(proto, **kwargs):
+        converted.append(proto)
+        return {"content": "Grok answer"}
+
+    monkeypatch.setattr(json_format, "MessageToDict", fake_message_to_dict)
+
+    class ProtoGrokResponse(FakeGrokResponse):
+        proto = object()
+
+    adapter = GrokAdapter({"api_key": "test", "include_proto_raw": True})
+    adapter.client = SimpleNamespace(
+        chat=_FakeChatFactory(ProtoGrokResponse())
+    )
+    adapter.chat_helpers = SimpleNamespace(user=lambda *contents: contents)
+
+    response = adapter.run("hello grok", model="grok-test")
+
+    # The proto walk is deferred until raw["proto"] is actually read.
+    assert converted == []
+    assert response.raw["proto"] == {"content": "Grok answer"}
+    assert converted == [ProtoGrokResponse.proto]
+
+
+@pytest.mark.parametrize(
+    "adapter_fixture,make_fakes",
+    PROVIDERS,
+    ids=[name.removesuffix("_adapter") for name, _ in PROVIDERS],
+)
+def test_adapter_payload_and_citations(
+    request, tmp_path, hello_text, client_ns, adapter_fixture, make_fakes
+):
+    adapter = request.getfixturevalue(adapter_fixture)
+    run_kwargs, expected_text, expected_urls, check = make_fakes(
+        adapter, tmp_path, hello_text, client_ns
+    )
+
+    response = adapter.run(
+        run_kwargs.pop("prompt"), return_citations=True, **run_kwargs
+    )
+
+    assert response.text == expected_text
+    assert {c.url for c in response.citations} >= expected_urls
+    check(response)
@@ -0,0 +1,66 @@
+"""Invariants of the Anthropic tool-input schema normalizer."""
+
+import copy
+from collections import deque
+
+import pytest
+from pydantic import BaseModel, Field
+
+from simpleai.adapters.anthropic_adapter import AnthropicAdapter
+
+# Keys that mark a node as an object schema even without "type": "object".
+_OBJECTISH_KEYS = frozenset(
+    {"properties", "required", "patternProperties", "additionalProperties"}
+)
+
+
+class OutputWithDictModel(BaseModel):
+    name: str
+    attributes: dict[str, str]
+
+
+class OutputWithBoundedArrayModel(BaseModel):
+    items: list[str] = Field(min_length=1, max_length=5)
+
+
+# Generated once: pydantic re-walks the core schema on every
+# model_json_schema() call. The normalizer mutates in place, so each
+# test hands it a deep copy.
+_DICT_SCHEMA = OutputWithDictModel.model_json_schema()
+_BOUNDED_SCHEMA = OutputWithBoundedArrayModel.model_json_schema()
+
+
+def _assert_invariants(schema):
+    """Check closed objects and stripped array keywords in one pass."""
+    stack = deque([schema])
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            if node.get("type") == "object" or not _OBJECTISH_KEYS.isdisjoint(
+                node
+            ):
+                assert node.get("additionalProperties") is False
+            assert "minItems" not in node
+            assert "maxItems" not in node
+            assert "uniqueItems" not in node
+            stack.extend(
+                value
+                for value in node.values()
+                if isinstance(value, (dict, list))
+            )
+        elif isinstance(node, list):
+            stack.extend(node)
+
+
+@pytest.mark.parametrize(
+    "source_schema",
+    [_DICT_SCHEMA, _BOUNDED_SCHEMA],
+    ids=["dict-fields", "bounded-array"],
+)
+def test_anthropic_schema_normalization_invariants(source_schema):
+    adapter = AnthropicAdapter({"api_key": "test"})
+    schema = adapter._normalize_schema_for_anthropic(
+        copy.deepcopy(source_schema)
+    )
+
+    _assert_invariants(schema)
@@ -0,0 +1,112 @@
+"""FleetDispatcher batching against a fake Batch API client."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from simpleai.dispatcher import FleetDispatcher
+
+
+class _FakeBatchAPI:
+    """In-memory files/batches endpoints that echo each request body back.
+
+    ``batches.create`` pre-computes the output file from the uploaded
+    jsonl, so every queued request resolves to ``{"echo": <its body>}``.
+    ``upload_delay`` stretches the upload so a test can submit while a
+    flush is in flight.
+    """
+
+    def __init__(self, upload_delay=0.0):
+        self.upload_delay = upload_delay
+        self.input_records = []
+        self.create_calls = 0
+        self._blobs = {}
+
+    async def files_create(self, file, purpose):
+        if self.upload_delay:
+            await asyncio.sleep(self.upload_delay)
+        _, blob = file
+        file_id = f"in-{len(self._blobs) + 1}"
+        self._blobs[file_id] = blob.decode("utf-8")
+        return SimpleNamespace(id=file_id)
+
+    async def files_content(self, output_file_id):
+        return SimpleNamespace(text=self._blobs[output_file_id])
+
+    async def batches_create(self, input_file_id, endpoint, completion_window):
+        self.create_calls += 1
+        lines = []
+        for line in self._blobs[input_file_id].splitlines():
+            record = json.loads(line)
+            self.input_records.append(record)
+            lines.append(
+                json.dumps(
+                    {
+                        "custom_id": record["custom_id"],
+                        "response": {"body": {"echo": record["body"]}},
+                    }
+                )
+            )
+        output_id = f"out-{self.create_calls}"
+        self._blobs[output_id] = "\n".join(lines) + "\n"
+        return SimpleNamespace(
+            id=f"batch-{self.create_calls}",
+            status="completed",
+            output_file_id=output_id,
+        )
+
+    def as_adapter(self):
+        return SimpleNamespace(
+            async_client=SimpleNamespace(
+                files=SimpleNamespace(
+                    create=self.files_create, content=self.files_content
+                ),
+                batches=SimpleNamespace(create=self.batches_create),
+            )
+        )
+
+
+def test_flush_ships_one_batch_and_preserves_ordering():
+    api = _FakeBatchAPI()
+    dispatcher = FleetDispatcher(
+        api.as_adapter(), batch_window_ms=10, batch_min_size=2
+    )
+
+    async def scenario():
+        first = await dispatcher.submit(
+            latency_budget_ms=600_000, payload={"input": "a"}
+        )
+        second = await dispatcher.submit(
+            latency_budget_ms=600_000, payload={"input": "b"}
+        )
+        return await asyncio.gather(first, second)
+
+    first_result, second_result = asyncio.run(scenario())
+
+    assert api.create_calls == 1
+    assert [r["custom_id"] for r in api.input_records] == ["req-0", "req-1"]
+    assert first_result == {"echo": {"input": "a"}}
+    assert second_result == {"echo": {"input": "b"}}
+
+
+def test_submission_during_flush_gets_its_own_flusher():
+    api = _FakeBatchAPI(upload_delay=0.05)
+    dispatcher = FleetDispatcher(api.as_adapter(), batch_window_ms=10)
+
+    async def scenario():
+        first = await dispatcher.submit(
+            latency_budget_ms=600_000, payload={"input": "a"}
+        )
+        # Land the second submit while the first flush is mid-upload;
+        # it must not strand waiting for an unrelated later submit.
+        await asyncio.sleep(0.03)
+        second = await dispatcher.submit(
+            latency_budget_ms=600_000, payload={"input": "b"}
+        )
+        return await asyncio.wait_for(asyncio.gather(first, second), 5.0)
+
+    first_result, second_result = asyncio.run(scenario())
+
+    assert api.create_calls == 2
+    assert first_result == {"echo": {"input": "a"}}
+    assert second_result == {"echo": {"input": "b"}}
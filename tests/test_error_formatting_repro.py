@@ -0,0 +1,48 @@
+"""Repro of the OpenAI adapter's provider-error message formatting."""
+
+from types import SimpleNamespace
+
+from simpleai.adapters.openai_adapter import format_provider_error
+
+# Matches the adapter's header list (which is alphabetically ordered, so
+# a sorted set intersection reproduces its ordering).
+_RELEVANT_RATELIMIT_HEADERS = frozenset(
+    (
+        "x-ratelimit-limit-requests",
+        "x-ratelimit-limit-tokens",
+        "x-ratelimit-remaining-requests",
+    )
+)
+
+
+class TestErrorFormatting:
+    def test_formatting(self):
+        ext_headers = {
+            "x-ratelimit-limit-requests": "500",
+            "x-ratelimit-limit-tokens": "30000",
+            "x-ratelimit-remaining-requests": "0",
+            "content-type": "application/json",
+        }
+        exc = RuntimeError("429 Too Many Requests")
+        exc.response = SimpleNamespace(headers=ext_headers)
+
+        # Build the expected message the same way the adapter does; the
+        # dict-view intersection hashes each candidate key once.
+        details = [
+            f"{key}: {ext_headers[key]}"
+            for key in sorted(_RELEVANT_RATELIMIT_HEADERS & ext_headers.keys())
+            if ext_headers[key] is not None
+        ]
+        # Single join over a flat parts list: one final allocation.
+        parts = [f"OpenAI adapter failed: {exc}"]
+        if details:
+            parts.append("\nRate limit headers:")
+            parts.extend(details)
+        msg = "\n".join(parts)
+
+        assert format_provider_error(exc) == msg
+
+    def test_formatting_without_headers(self):
+        exc = RuntimeError("boom")
+
+        assert format_provider_error(exc) == "OpenAI adapter failed: boom"
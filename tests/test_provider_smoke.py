@@ -0,0 +1,135 @@
+"""Smoke-matrix orchestration against a stubbed run_prompt."""
+
+import importlib
+
+import pytest
+
+from simpleai.adapters.base import Citation
+from simpleai.provider_smoke import (
+    JobExperience,
+    JobHistory,
+    resolve_sample_file_path,
+    run_provider_matrix,
+)
+
+
+def patch_many(mp, module_path, **attrs):
+    """Patch several attributes on one module, resolving it only once."""
+    module = importlib.import_module(module_path)
+    for name, value in attrs.items():
+        mp.setattr(module, name, value)
+
+
+# Built once: the matrix only reads the history, so every stubbed call
+# can hand back the same instance.
+_CANNED_JOB_HISTORY = JobHistory(
+    experiences=[
+        JobExperience(
+            company_name="Acme",
+            role_title="Engineer",
+            start_date="2020-01",
+            end_date="2023-05",
+            company_url="https://acme.example",
+        )
+    ]
+)
+
+
+def _raise_exploded():
+    raise RuntimeError("anthropic exploded")
+
+
+# Dict dispatch: one lookup per call instead of an equality cascade.
+_MODEL_HANDLERS = {
+    "openai": lambda: (
+        _CANNED_JOB_HISTORY,
+        [Citation(provider="openai", url="https://acme.example")],
+    ),
+    "anthropic": _raise_exploded,
+    "gemini": lambda: (_CANNED_JOB_HISTORY, []),
+    "grok": lambda: (
+        _CANNED_JOB_HISTORY,
+        [Citation(provider="grok", url="https://grok.example")],
+    ),
+}
+
+
+def fake_run_prompt(prompt, *, model=None, **kwargs):
+    handler = _MODEL_HANDLERS.get(model)
+    if handler is None:
+        raise RuntimeError(f"unexpected model {model!r}")
+    return handler()
+
+
+def test_run_provider_matrix_classifies_outcomes(monkeypatch, sample_pdf):
+    patch_many(
+        monkeypatch,
+        "simpleai.provider_smoke",
+        load_settings=lambda settings_file=None: {
+            "providers": {"anthropic": {"max_retries": 0}}
+        },
+        get_provider_api_key=lambda settings, provider: (
+            None if provider == "perplexity" else "key"
+        ),
+        run_prompt=fake_run_prompt,
+    )
+
+    summary = run_provider_matrix(file_path=sample_pdf, use_cache=False)
+
+    assert summary == {
+        "OpenAI": "success",
+        "Anthropic": "failed",
+        "Gemini": "failed",
+        "Grok": "success",
+        "Perplexity": "missing_key",
+    }
+
+
+def test_run_provider_matrix_requires_citations(monkeypatch, sample_pdf):
+    patch_many(
+        monkeypatch,
+        "simpleai.provider_smoke",
+        load_settings=lambda settings_file=None: {"providers": {}},
+        get_provider_api_key=lambda settings, provider: "key",
+        run_prompt=lambda prompt, **kwargs: (_CANNED_JOB_HISTORY, []),
+    )
+
+    summary = run_provider_matrix(file_path=sample_pdf, use_cache=False)
+
+    assert set(summary.values()) == {"failed"}
+
+
+def test_run_provider_matrix_caches_successful_runs(
+    monkeypatch, sample_pdf, tmp_path
+):
+    patch_many(
+        monkeypatch,
+        "simpleai.provider_smoke",
+        SMOKE_CACHE_DIR=tmp_path / "cache",
+        load_settings=lambda settings_file=None: {"providers": {}},
+        get_provider_api_key=lambda settings, provider: "key",
+    )
+    calls = []
+
+    def counting_run_prompt(prompt, **kwargs):
+        calls.append(kwargs["model"])
+        return _CANNED_JOB_HISTORY, [
+            Citation(provider="openai", url="https://acme.example")
+        ]
+
+    monkeypatch.setattr(
+        "simpleai.provider_smoke.run_prompt", counting_run_prompt
+    )
+
+    first = run_provider_matrix(file_path=sample_pdf, only=["openai"])
+    second = run_provider_matrix(file_path=sample_pdf, only=["openai"])
+
+    assert first == second == {"OpenAI": "success"}
+    assert calls == ["openai"]
+
+
+def test_resolve_sample_file_path_explicit(sample_pdf, tmp_path):
+    assert resolve_sample_file_path(sample_pdf) == sample_pdf
+
+    with pytest.raises(FileNotFoundError):
+        resolve_sample_file_path(tmp_path / "missing.pdf")
@@ -0,0 +1,328 @@
+"""run_prompt orchestration against a stubbed adapter."""
+
+import copy
+import os
+from functools import lru_cache
+from types import MappingProxyType
+
+import pytest
+from pydantic import BaseModel, ConfigDict
+
+from simpleai import api as _api
+from simpleai.adapters.base import AdapterResponse, Citation
+from simpleai.api import run_prompt
+from simpleai.settings import SettingsError
+
+
+# Every test runs under the patch context, whether or not it installs an
+# adapter; this keeps the module stateless per test for sharded runs.
+pytestmark = pytest.mark.usefixtures("patched_api")
+
+
+class PayloadModel(BaseModel):
+    # Stays a BaseModel: run_prompt needs model_validate_json and schema
+    # generation. The config just pins validation to the cheap path.
+    model_config = ConfigDict(validate_assignment=False, extra="ignore")
+
+    value: int
+
+
+# One canned response worth of parts, built once at import: every run()
+# call reuses them instead of re-validating a fresh Citation.
+_TEXT = '{"value": 7}'
+_CITATIONS = [
+    Citation(provider="openai", url="https://example.com", title="Example")
+]
+_RAW = {"ok": True}
+_RESPONSE = AdapterResponse(text=_TEXT, citations=_CITATIONS, raw=_RAW)
+
+
+class DummyAdapter:
+    # Slotted: attribute access is a fixed offset, and copy.copy stays
+    # cheap because there is no per-instance __dict__ to duplicate.
+    __slots__ = ("supports_binary_files", "record_kwargs", "last_kwargs")
+
+    provider_name = "openai"
+
+    def __init__(self, supports_binary_files=False, record_kwargs=True):
+        self.supports_binary_files = supports_binary_files
+        self.record_kwargs = record_kwargs
+        self.last_kwargs = {}
+
+    def run(self, prompt, **kwargs):
+        # Tests that never read last_kwargs opt out of recording, so the
+        # adapter does not pin the call's argument refs past the run.
+        if self.record_kwargs:
+            kwargs["prompt"] = prompt
+            self.last_kwargs = kwargs
+        return _RESPONSE
+
+
+# Read-only views: a test mutating shared settings should fail loudly.
+BASE_SETTINGS = MappingProxyType(
+    {
+        "default_provider": "openai",
+        "providers": MappingProxyType(
+            {
+                "openai": MappingProxyType(
+                    {"model": "gpt-5", "options": {"temperature": 0.2}}
+                ),
+                "grok": MappingProxyType({"model": "grok-4"}),
+            }
+        ),
+        "logging": MappingProxyType({"enabled": False}),
+        "cache": MappingProxyType({}),
+    }
+)
+
+# Shared stubs: one function object for the whole module instead of a
+# fresh lambda per patch.
+_RP_RESULT = ("openai", "gpt-5")
+
+
+# Memoized so repeat lookups inside one run_prompt call cost a cache
+# hit, not a fresh return; the result is shared and read-only anyway.
+@lru_cache(maxsize=1)
+def _fake_load_settings(settings_file=None):
+    return BASE_SETTINGS
+
+
+def _fake_resolve(settings, model):
+    return _RP_RESULT
+
+# Prototype adapters, copied per test: construction happens once and
+# each copy gets a fresh last_kwargs so recordings never bleed over.
+_PROTOTYPE = DummyAdapter()
+_BINARY_PROTOTYPE = DummyAdapter(supports_binary_files=True)
+_QUIET_PROTOTYPE = DummyAdapter(record_kwargs=False)
+
+
+def _assert_kwargs(adapter, **expected):
+    """One rewritten assert for a batch of recorded-kwarg expectations."""
+    recorded = adapter.last_kwargs
+    assert {key: recorded.get(key) for key in expected} == expected
+
+
+def _fresh_adapter(prototype=_PROTOTYPE):
+    adapter = copy.copy(prototype)
+    adapter.last_kwargs = {}
+    return adapter
+
+
+@pytest.fixture(scope="module")
+def note_file(tmp_path_factory):
+    """One shared attachment; the tests only read it."""
+    path = tmp_path_factory.mktemp("notes") / "note.txt"
+    path.write_text("attached content", encoding="utf-8")
+    return path
+
+
+@pytest.fixture(scope="class")
+def base_patches():
+    """Class-lifetime patches for the collaborators every test shares.
+
+    One manually-managed ``MonkeyPatch`` applies the ``load_settings``
+    and ``resolve_provider_and_model`` stubs once per class instead of
+    once per test.
+    """
+    mp = pytest.MonkeyPatch()
+    mp.setattr(_api, "load_settings", _fake_load_settings)
+    mp.setattr(_api, "resolve_provider_and_model", _fake_resolve)
+    yield mp
+    mp.undo()
+
+
+@pytest.fixture
+def patched_api():
+    """Installer for the per-test adapter (and optional settings).
+
+    The stable patches live in ``base_patches``; this context only holds
+    what genuinely varies per test, so teardown is one context-exit.
+    """
+    with pytest.MonkeyPatch.context() as mp:
+
+        def _install(adapter, settings=BASE_SETTINGS):
+            if settings is not BASE_SETTINGS:
+                mp.setattr(
+                    _api, "load_settings", lambda settings_file=None: settings
+                )
+            mp.setattr(_api, "get_adapter", lambda provider, settings: adapter)
+            return adapter
+
+        yield _install
+
+
+@pytest.mark.usefixtures("base_patches")
+class TestRunPrompt:
+    def test_returns_model_instance(self, patched_api):
+        patched_api(_fresh_adapter(_QUIET_PROTOTYPE))
+
+        result = run_prompt(
+            "hello", model="openai", output_format=PayloadModel
+        )
+
+        assert isinstance(result, PayloadModel)
+        assert result.value == 7
+
+    def test_forwards_stream_flag(self, patched_api):
+        adapter = patched_api(_fresh_adapter())
+
+        run_prompt("hello", model="openai", stream=True)
+
+        _assert_kwargs(adapter, stream=True)
+
+    def test_returns_text_without_output_format(self, patched_api):
+        patched_api(_fresh_adapter(_QUIET_PROTOTYPE))
+
+        result = run_prompt("hello", model="openai")
+
+        assert result == '{"value": 7}'
+
+    def test_merges_provider_kwargs(self, patched_api):
+        adapter = patched_api(_fresh_adapter())
+
+        run_prompt("hello", model="openai", top_p=0.8)
+
+        _assert_kwargs(adapter, temperature=0.2, top_p=0.8)
+
+    @pytest.mark.parametrize(
+        "kwargs",
+        [
+            {"return_citations": True},
+            {"require_search": True},
+            {"require_search": False, "return_citations": True},
+        ],
+        ids=[
+            "citations",
+            "search-implies-citations",
+            "citations-force-search",
+        ],
+    )
+    def test_citations_and_search_imply_each_other(self, patched_api, kwargs):
+        adapter = patched_api(_fresh_adapter())
+
+        result, citations = run_prompt("hello", model="openai", **kwargs)
+
+        assert result == '{"value": 7}'
+        assert citations[0].url == "https://example.com"
+        _assert_kwargs(adapter, require_search=True, return_citations=True)
+
+    def test_extracts_files_when_binary_not_supported(
+        self, patched_api, note_file
+    ):
+        adapter = patched_api(_fresh_adapter())
+
+        run_prompt("hello", model="openai", file_paths=[note_file])
+
+        _assert_kwargs(adapter, files=None)
+        prompt = adapter.last_kwargs["prompt"]
+        assert "[File: note.txt]" in prompt
+        assert "attached content" in prompt
+
+    def test_passes_binary_files_when_supported(self, patched_api, note_file):
+        adapter = patched_api(_fresh_adapter(_BINARY_PROTOTYPE))
+
+        run_prompt("hello", model="openai", file_paths=[note_file])
+
+        _assert_kwargs(adapter, files=[note_file], prompt="hello")
+
+    def test_cache_misses_when_citations_requested(self, patched_api, tmp_path):
+        calls = []
+
+        class CountingAdapter(DummyAdapter):
+            __slots__ = ()
+
+            def run(self, prompt, **kwargs):
+                calls.append(prompt)
+                return super().run(prompt, **kwargs)
+
+        adapter = _fresh_adapter(CountingAdapter(record_kwargs=False))
+        patched_api(
+            adapter, dict(BASE_SETTINGS, cache={"dir": str(tmp_path)})
+        )
+
+        run_prompt("hello", model="openai")
+        result, citations = run_prompt(
+            "hello", model="openai", return_citations=True
+        )
+
+        # The grounded run must not alias the plain run's cache entry.
+        assert len(calls) == 2
+        assert citations[0].url == "https://example.com"
+
+    def test_retries_with_validation_feedback(self, patched_api, monkeypatch):
+        calls = []
+
+        class FlakyAdapter(DummyAdapter):
+            __slots__ = ()
+
+            def run(self, prompt, **kwargs):
+                calls.append(prompt)
+                response = super().run(prompt, **kwargs)
+                if len(calls) == 1:
+                    return AdapterResponse(
+                        text='{"value": "not a number"}',
+                        citations=_CITATIONS,
+                        raw=_RAW,
+                    )
+                return response
+
+        monkeypatch.setattr(_api.time, "sleep", lambda seconds: None)
+        patched_api(_fresh_adapter(FlakyAdapter(record_kwargs=False)))
+
+        result = run_prompt(
+            "hello", model="openai", output_format=PayloadModel
+        )
+
+        assert result.value == 7
+        assert len(calls) == 2
+        retry_prompt = calls[1]
+        assert retry_prompt[0] == "hello"
+        assert "failed validation" in retry_prompt[-1]
+
+    def test_short_circuits_on_cache_hit(self, patched_api, tmp_path):
+        calls = []
+
+        # Subclass rather than instance patching: DummyAdapter is
+        # slotted, so run cannot be overridden on the instance.
+        class CountingAdapter(DummyAdapter):
+            __slots__ = ()
+
+            def run(self, prompt, **kwargs):
+                calls.append(prompt)
+                return super().run(prompt, **kwargs)
+
+        adapter = _fresh_adapter(CountingAdapter(record_kwargs=False))
+        patched_api(
+            adapter, dict(BASE_SETTINGS, cache={"dir": str(tmp_path)})
+        )
+
+        first = run_prompt(
+            "hello", model="openai", output_format=PayloadModel
+        )
+        second = run_prompt(
+            "hello", model="openai", output_format=PayloadModel
+        )
+
+        assert first.value == 7
+        assert second.value == 7
+        assert len(calls) == 1
+
+
+# Outside the class on purpose: this test exercises the real provider
+# resolution, which base_patches would stub away.
+def test_run_prompt_missing_provider_key_raises_settings_error(monkeypatch):
+    monkeypatch.setattr(_api, "load_settings", _fake_load_settings)
+    # One stripped-environ view instead of two delenv scans/restores.
+    monkeypatch.setattr(
+        os,
+        "environ",
+        {
+            key: value
+            for key, value in os.environ.items()
+            if key not in {"XAI_API_KEY", "GROK_API_KEY"}
+        },
+    )
+
+    with pytest.raises(SettingsError):
+        run_prompt("hello", model="grok")